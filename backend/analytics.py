@@ -0,0 +1,183 @@
+"""
+Incremental aggregation engine for the dashboard / analytics endpoints.
+Each lead contributes to counters (status, industry, product, detection week) and confidence sums.
+Updates subtract a lead's previous contribution and add the new one, so cost is per changed lead,
+and snapshots read a handful of counters regardless of how many leads are behind them.
+"""
+
+import os
+import re
+import threading
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+# Pipeline stages in funnel order; a lead at a later stage has passed every earlier one
+STATUSES = ("Detected", "Verified", "Contacted", "Converted")
+STATUS_COLORS = {"Detected": "#64748b", "Verified": "#3b82f6", "Contacted": "#eab308", "Converted": "#22c55e"}
+PRODUCTS = ("HSD", "FO", "Bitumen", "Hexane", "LPG")
+PRODUCT_ALIASES = {"furnace oil": "FO", "high speed diesel": "HSD", "diesel": "HSD"}
+
+# Confidence at or above which a lead counts as high-confidence
+HIGH_CONFIDENCE = float(os.environ.get("ANALYTICS_HIGH_CONFIDENCE", "90"))
+# Number of weekly buckets in the leads-over-time window
+ANALYTICS_WEEKS = int(os.environ.get("ANALYTICS_WEEKS", "5"))
+
+_PAREN = re.compile(r"\s*\(.*?\)")
+
+
+def normalize_product(name: str) -> str:
+    """'Furnace Oil (~40 KL/month)' -> 'FO'; unknown products -> 'Others'."""
+    base = _PAREN.sub("", name or "").strip()
+    base = PRODUCT_ALIASES.get(base.lower(), base)
+    return base if base in PRODUCTS else "Others"
+
+
+def pipeline_status(lead: dict) -> str:
+    status = lead.get("status")
+    if status in STATUSES:
+        return status
+    verified = lead.get("verified") or {}
+    return "Verified" if verified and all(verified.values()) else "Detected"
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def _parse_day(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value)).date()
+    except ValueError:
+        return None
+
+
+def _average(total: float, count: int) -> float:
+    return round(total / count, 1) if count else 0.0
+
+
+class LeadAnalytics:
+    """
+    apply(updated, removed_ids) folds lead changes into the aggregates (usable as a LeadView on_update hook).
+    Snapshot methods return the endpoint payloads. now_fn() -> current date (injectable for tests).
+    first_seen_fn(lead_ids) -> {lead id: date} dates leads without detectedAt (e.g. from the persistent
+    lead store, so restarts do not move them into the current week); unknown leads fall back to now_fn().
+    """
+
+    def __init__(self, now_fn=None, first_seen_fn=None):
+        self.now_fn = now_fn or date.today
+        self.first_seen_fn = first_seen_fn
+        self._lock = threading.Lock()
+        self._contrib = {}  # lead id -> contribution currently counted
+        self._first_seen = {}  # lead id -> detection day for leads without detectedAt
+        self._status = Counter()
+        self._industry = Counter()
+        self._product = Counter()
+        self._industry_confidence = Counter()  # industry -> confidence sum
+        self._product_confidence = Counter()  # product -> confidence sum
+        self._weekly = Counter()  # (week start, "detected" | "certified") -> count
+        self._confidence_sum = 0.0
+        self._high_confidence = 0
+
+    def _contribution(self, lead: dict) -> tuple:
+        lead_id = lead["id"]
+        day = _parse_day(lead.get("detectedAt"))
+        if day is None:
+            day = self._first_seen.setdefault(lead_id, self.now_fn())
+        products = tuple(sorted({normalize_product(p) for p in lead.get("products") or []}))
+        confidence = float(lead.get("confidence") or 0.0)
+        return (pipeline_status(lead), lead.get("industry") or "Other", products, week_start(day), confidence)
+
+    def _count(self, contrib: tuple, sign: int):
+        status, industry, products, week, confidence = contrib
+        self._status[status] += sign
+        self._industry[industry] += sign
+        self._industry_confidence[industry] += sign * confidence
+        for product in products:
+            self._product[product] += sign
+            self._product_confidence[product] += sign * confidence
+        self._weekly[(week, "detected")] += sign
+        if status != "Detected":
+            self._weekly[(week, "certified")] += sign
+        self._confidence_sum += sign * confidence
+        self._high_confidence += sign * (confidence >= HIGH_CONFIDENCE)
+
+    def apply(self, updated: list, removed_ids=()):
+        with self._lock:
+            undated = [
+                lead["id"] for lead in updated
+                if lead["id"] not in self._first_seen and _parse_day(lead.get("detectedAt")) is None
+            ]
+            if undated and self.first_seen_fn is not None:
+                self._first_seen.update(self.first_seen_fn(undated))
+            for lead in updated:
+                new = self._contribution(lead)
+                old = self._contrib.get(lead["id"])
+                if old == new:
+                    continue
+                if old is not None:
+                    self._count(old, -1)
+                self._count(new, +1)
+                self._contrib[lead["id"]] = new
+            for lead_id in removed_ids:
+                old = self._contrib.pop(lead_id, None)
+                self._first_seen.pop(lead_id, None)
+                if old is not None:
+                    self._count(old, -1)
+
+    def count(self) -> int:
+        return len(self._contrib)
+
+    # ============ Snapshots ============
+
+    def _weeks(self) -> list:
+        current = week_start(self.now_fn())
+        return [current - timedelta(weeks=i) for i in range(ANALYTICS_WEEKS - 1, -1, -1)]
+
+    def kpis(self) -> dict:
+        with self._lock:
+            total = len(self._contrib)
+            reached_contact = self._status["Contacted"] + self._status["Converted"]
+            return {
+                "warmEntitiesThisWeek": self._weekly[(week_start(self.now_fn()), "detected")],
+                "highConfidenceLeads": self._high_confidence,
+                # Share of leads taken to a sales conversation that converted
+                "conversionRate": round(100 * self._status["Converted"] / reached_contact, 1) if reached_contact else 0.0,
+                "avgConfidence": round(self._confidence_sum / total, 1) if total else 0.0,
+            }
+
+    def leads_over_time(self) -> list:
+        with self._lock:
+            return [
+                {"date": week.isoformat(), "detected": self._weekly[(week, "detected")], "certified": self._weekly[(week, "certified")]}
+                for week in self._weeks()
+            ]
+
+    def product_demand(self) -> list:
+        """Share (%) of product mentions across leads, with the average confidence of leads mentioning each."""
+        with self._lock:
+            counts = {name: self._product[name] for name in (*PRODUCTS, "Others")}
+            sums = {name: self._product_confidence[name] for name in counts}
+        total = sum(counts.values())
+        ranked = sorted(counts.items(), key=lambda kv: -kv[1])
+        return [
+            {"name": name, "value": round(100 * n / total) if total else 0, "avgConfidence": _average(sums[name], n)}
+            for name, n in ranked
+        ]
+
+    def lead_status(self) -> list:
+        with self._lock:
+            return [{"name": s, "value": self._status[s], "color": STATUS_COLORS[s]} for s in STATUSES]
+
+    def funnel(self) -> list:
+        """Leads that reached each stage (cumulative over later stages)."""
+        with self._lock:
+            counts = [self._status[s] for s in STATUSES]
+        return [{"stage": s, "count": sum(counts[i:])} for i, s in enumerate(STATUSES)]
+
+    def sectors(self) -> list:
+        with self._lock:
+            ranked = sorted(((name, n) for name, n in self._industry.items() if n > 0), key=lambda kv: (-kv[1], kv[0]))
+            sums = {name: self._industry_confidence[name] for name, _ in ranked}
+        return [{"name": name, "count": n, "avgConfidence": _average(sums[name], n)} for name, n in ranked]
@@ -0,0 +1,201 @@
+"""
+Streaming bulk scoring for CSV / NDJSON uploads.
+The upload is parsed incrementally, scored in fixed-size chunks (one batched predict per chunk)
+and streamed back as NDJSON, so memory stays constant and results start before the upload ends.
+"""
+
+import asyncio
+import codecs
+import csv
+import json
+import os
+
+from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
+
+CHUNK_SIZE = int(os.environ.get("SCORE_STREAM_CHUNK_SIZE", "1000"))
+# Longest accepted line / CSV record in characters; longer ones become error rows instead of growing memory
+MAX_RECORD_CHARS = int(os.environ.get("SCORE_STREAM_MAX_RECORD_CHARS", str(1 << 20)))
+
+# Accepted input column names -> (company, signal)
+COMPANY_KEYS = ("company_name", "company")
+SIGNAL_KEYS = ("signal_text", "signal")
+
+
+class _LineSplitter:
+    """Splits decoded text into lines, keeping at most max_chars + 1 characters of the current line."""
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.pending, self.size = [], 0
+
+    def _keep(self, part: str) -> None:
+        if self.size <= self.max_chars and part:
+            part = part[: self.max_chars + 1 - self.size]
+            self.pending.append(part)
+            self.size += len(part)
+
+    def feed(self, text: str) -> list:
+        *complete, rest = text.split("\n")
+        lines = []
+        for part in complete:
+            self._keep(part)
+            lines.append("".join(self.pending).rstrip("\r"))
+            self.pending, self.size = [], 0
+        self._keep(rest)
+        return lines
+
+    def close(self) -> list:
+        return ["".join(self.pending).rstrip("\r")] if self.pending else []
+
+
+async def iter_lines(byte_stream, max_chars: int = MAX_RECORD_CHARS):
+    """
+    Decode an async stream of byte chunks into text lines (without line endings).
+    Only newly decoded text is split, and a line longer than max_chars is cut to max_chars + 1 characters
+    (the rest is dropped), so an upload without newlines cannot grow memory; the parsers report such lines.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    splitter = _LineSplitter(max_chars)
+    async for chunk in byte_stream:
+        for line in splitter.feed(decoder.decode(chunk)):
+            yield line
+    for line in splitter.feed(decoder.decode(b"", final=True)) + splitter.close():
+        yield line
+
+
+def _in_quoted_field(line: str, in_quotes: bool) -> bool:
+    """
+    Whether a CSV record is still inside a quoted field at the end of `line`.
+    Follows the csv module: a quote opens a quoted field only as a field's first character,
+    "" inside one is an escaped quote, and any other quote is a literal.
+    """
+    i, n = 0, len(line)
+    field_start = not in_quotes
+    while i < n:
+        if in_quotes:
+            j = line.find('"', i)
+            if j < 0:
+                return True
+            if j + 1 < n and line[j + 1] == '"':
+                i = j + 2
+                continue
+            in_quotes, field_start, i = False, False, j + 1
+        elif field_start and line[i] == '"':
+            in_quotes, i = True, i + 1
+        else:
+            j = line.find(",", i)
+            if j < 0:
+                return False
+            field_start, i = True, j + 1
+    return in_quotes
+
+
+async def iter_csv_records(lines, max_chars: int = MAX_RECORD_CHARS):
+    """
+    Parse CSV lines (header row first) into dicts. Quoted fields may span lines.
+    Quote state is tracked line by line, so each line is scanned once. A record longer than max_chars
+    becomes an error record and parsing resumes at the next line.
+    """
+    header = None
+    record, size = [], 0
+    in_quotes = False
+    async for line in lines:
+        size += len(line) + 1
+        if size > max_chars + 1:
+            record, size, in_quotes = [], 0, False
+            yield {"error": f"Record exceeds {max_chars} characters"}
+            continue
+        record.append(line)
+        # Unquoted lines without a quote (the common case) end the record without a scan
+        if in_quotes or '"' in line:
+            in_quotes = _in_quoted_field(line, in_quotes)
+            if in_quotes:
+                continue
+        text, record, size = "\n".join(record), [], 0
+        if not text.strip():
+            continue
+        row = next(csv.reader([text]))
+        if header is None:
+            header = [h.strip() for h in row]
+            continue
+        yield dict(zip(header, row))
+    if record:
+        yield {"error": "Unterminated quoted field at end of upload"}
+
+
+async def iter_ndjson_records(lines, max_chars: int = MAX_RECORD_CHARS):
+    """Parse NDJSON lines into dicts; malformed lines become error records instead of aborting the stream."""
+    async for line in lines:
+        if not line.strip():
+            continue
+        if len(line) > max_chars:
+            yield {"error": f"Record exceeds {max_chars} characters"}
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield {"error": f"Invalid JSON: {e}"}
+            continue
+        yield record if isinstance(record, dict) else {"error": "Expected a JSON object per line"}
+
+
+def _pair(record: dict):
+    company = next((record[k] for k in COMPANY_KEYS if record.get(k)), None)
+    signal = next((record[k] for k in SIGNAL_KEYS if record.get(k)), "")
+    return (str(company), str(signal)) if company is not None else None
+
+
+async def score_records(records, predict_fn, chunk_size: int = CHUNK_SIZE):
+    """
+    Score records in chunks of chunk_size and yield NDJSON lines.
+    predict_fn(pairs) -> one result dict per pair (e.g. confidence, model_version); runs off the event loop.
+    """
+    chunk = []
+    row = 0
+    async for record in records:
+        chunk.append((row, record))
+        row += 1
+        if len(chunk) >= chunk_size:
+            yield await _score_chunk(chunk, predict_fn)
+            chunk = []
+    if chunk:
+        yield await _score_chunk(chunk, predict_fn)
+
+
+async def _score_chunk(chunk, predict_fn) -> bytes:
+    pairs = []
+    for _, record in chunk:
+        pairs.append(None if "error" in record else _pair(record))
+    valid = [p for p in pairs if p is not None]
+    results = iter(await asyncio.to_thread(predict_fn, valid) if valid else [])
+
+    out = []
+    for (row, record), pair in zip(chunk, pairs):
+        if pair is None:
+            error = record.get("error") or "Missing company_name"
+            out.append({"row": row, "error": error})
+        else:
+            out.append({**record, "row": row, **next(results)})
+    return ("\n".join(json.dumps(o, ensure_ascii=False) for o in out) + "\n").encode()
+
+
+def stream_scores(byte_stream, fmt: str, predict_fn, chunk_size: int = CHUNK_SIZE):
+    """Full pipeline: bytes -> lines -> records (csv|ndjson) -> NDJSON score lines."""
+    lines = iter_lines(byte_stream)
+    records = iter_csv_records(lines) if fmt == "csv" else iter_ndjson_records(lines)
+    return score_records(records, predict_fn, chunk_size)
+
+
+class UploadStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body iterator consumes the request body itself.
+    The base class listens for http.disconnect on ASGI < 2.4, which would swallow upload chunks;
+    here a disconnect surfaces through request.stream() (ClientDisconnect) instead.
+    """
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
@@ -0,0 +1,194 @@
+"""
+Depot registry and haversine spatial index for lead-to-depot assignment.
+Leads with coordinates get their nearest depot (and distance) in one vectorized query per batch,
+and "all leads within X km of a depot" is a radius query on an index over lead locations.
+Small point sets (the depot registry) use a chunked NumPy brute force; from BALLTREE_MIN_POINTS points a
+scikit-learn BallTree is built on first query if sklearn is installed. It is imported only then, since
+sklearn pulls in scipy and pandas, which serving otherwise never imports.
+"""
+
+import threading
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Bounds the brute-force distance matrix to about this many float64 cells per chunk
+_BRUTE_FORCE_CELLS = 1 << 22
+# Below this many indexed points brute force beats building and querying a BallTree
+BALLTREE_MIN_POINTS = 4096
+
+# HPCL depots / terminals serving the current lead regions
+DEPOTS = [
+    {"id": "panipat", "name": "Panipat Depot", "fullName": "Panipat HPCL Depot", "lat": 29.4000, "lng": 76.9300},
+    {"id": "delhi", "name": "Delhi Depot", "fullName": "Delhi HPCL Depot", "lat": 28.5360, "lng": 77.0490},
+    {"id": "vadodara", "name": "Vadodara Depot", "fullName": "Vadodara HPCL Depot", "lat": 22.3500, "lng": 73.1300},
+    {"id": "mundra", "name": "Mundra Depot", "fullName": "Mundra HPCL Depot", "lat": 22.7600, "lng": 69.7000},
+    {"id": "jamshedpur", "name": "Jamshedpur Depot", "fullName": "Jamshedpur HPCL Depot", "lat": 22.7800, "lng": 86.1500},
+]
+
+
+def haversine_km(lat1, lng1, lat2, lng2) -> np.ndarray:
+    """Great-circle distance in km between points given in degrees (broadcasts like NumPy)."""
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def format_distance(km: float) -> str:
+    """12.4 -> '12 km' (the depotDistance display format)."""
+    return f"{km:.0f} km"
+
+
+class GeoIndex:
+    """Nearest-neighbour and radius queries over fixed (lat, lng) points, distances in km."""
+
+    def __init__(self, lats, lngs):
+        self._lat = np.asarray(lats, dtype=np.float64).reshape(-1)
+        self._lng = np.asarray(lngs, dtype=np.float64).reshape(-1)
+        self._tree = None
+        self._tree_built = False
+
+    def __len__(self) -> int:
+        return len(self._lat)
+
+    def _balltree(self):
+        """BallTree over the points, or None for small sets / without sklearn. Built (and imported) on first use."""
+        if not self._tree_built:
+            if len(self) >= BALLTREE_MIN_POINTS:
+                try:
+                    from sklearn.neighbors import BallTree
+
+                    self._tree = BallTree(np.radians(np.column_stack([self._lat, self._lng])), metric="haversine")
+                except ImportError:
+                    pass
+            self._tree_built = True
+        return self._tree
+
+    def query(self, lats, lngs, k: int = 1):
+        """
+        k nearest points for each query location.
+        Returns (indices, distances_km), both shaped (n_queries, k) and sorted nearest first.
+        """
+        lats = np.asarray(lats, dtype=np.float64).reshape(-1)
+        lngs = np.asarray(lngs, dtype=np.float64).reshape(-1)
+        k = min(k, len(self))
+        if k <= 0 or len(lats) == 0:
+            return np.zeros((len(lats), 0), dtype=np.int64), np.zeros((len(lats), 0))
+        tree = self._balltree()
+        if tree is not None:
+            dist, idx = tree.query(np.radians(np.column_stack([lats, lngs])), k=k)
+            return idx, dist * EARTH_RADIUS_KM
+
+        idx = np.empty((len(lats), k), dtype=np.int64)
+        dist = np.empty((len(lats), k))
+        step = max(1, _BRUTE_FORCE_CELLS // len(self))
+        for start in range(0, len(lats), step):
+            rows = slice(start, start + step)
+            d = haversine_km(lats[rows, None], lngs[rows, None], self._lat[None, :], self._lng[None, :])
+            nearest = np.argpartition(d, k - 1, axis=1)[:, :k] if k < len(self) else np.broadcast_to(np.arange(k), d.shape)
+            nd = np.take_along_axis(d, nearest, axis=1)
+            order = np.argsort(nd, axis=1, kind="stable")
+            idx[rows] = np.take_along_axis(nearest, order, axis=1)
+            dist[rows] = np.take_along_axis(nd, order, axis=1)
+        return idx, dist
+
+    def query_radius(self, lat: float, lng: float, radius_km: float):
+        """Points within radius_km of one location: (indices, distances_km), nearest first."""
+        if len(self) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        tree = self._balltree()
+        if tree is not None:
+            idx, dist = tree.query_radius(
+                np.radians([[lat, lng]]), r=radius_km / EARTH_RADIUS_KM, return_distance=True, sort_results=True,
+            )
+            return idx[0], dist[0] * EARTH_RADIUS_KM
+        d = haversine_km(lat, lng, self._lat, self._lng)
+        idx = np.flatnonzero(d <= radius_km)
+        idx = idx[np.argsort(d[idx], kind="stable")]
+        return idx, d[idx]
+
+
+def _has_location(record: dict) -> bool:
+    return record.get("lat") is not None and record.get("lng") is not None
+
+
+class DepotRegistry:
+    """Registered depots with a spatial index; assigns nearest depots to batches of lead records."""
+
+    def __init__(self, depots=DEPOTS):
+        self.depots = [dict(d) for d in depots]
+        self._by_id = {d["id"]: d for d in self.depots}
+        self.index = GeoIndex([d["lat"] for d in self.depots], [d["lng"] for d in self.depots])
+
+    def list(self) -> list:
+        return self.depots
+
+    def get(self, depot_id: str):
+        return self._by_id.get(depot_id)
+
+    def nearest(self, lats, lngs, k: int = 1):
+        """k nearest depots per location: (depot index array, distance_km array), each (n, k)."""
+        return self.index.query(lats, lngs, k)
+
+    def assign(self, records, name_field: str = "name", k: int = 1) -> list:
+        """
+        Fill depot / depotDistance from the nearest depot for every record with lat/lng (one batched query).
+        With k > 1, nearbyDepots also lists the k nearest depots with their distances.
+        Records without a location are returned unchanged.
+        """
+        records = list(records)
+        located = [i for i, r in enumerate(records) if _has_location(r)]
+        if not located or not self.depots:
+            return records
+        idx, dist = self.nearest([records[i]["lat"] for i in located], [records[i]["lng"] for i in located], k)
+        for row, i in enumerate(located):
+            nearest = self.depots[idx[row, 0]]
+            extra = {"depot": nearest[name_field], "depotDistance": format_distance(dist[row, 0])}
+            if k > 1:
+                extra["nearbyDepots"] = [
+                    {"depot": self.depots[j][name_field], "distanceKm": round(float(d), 1)}
+                    for j, d in zip(idx[row], dist[row])
+                ]
+            records[i] = {**records[i], **extra}
+        return records
+
+
+class LocationIndex:
+    """
+    Radius queries over record locations (e.g. all leads within X km of a depot).
+    Kept in sync from update(); the spatial index is rebuilt lazily on the first query after a change.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._coords = {}  # record id -> (lat, lng)
+        self._snapshot = None  # (ids, GeoIndex), replaced atomically
+
+    def update(self, updated: list, removed_ids: list = ()) -> None:
+        with self._lock:
+            for record in updated:
+                if _has_location(record):
+                    self._coords[record["id"]] = (float(record["lat"]), float(record["lng"]))
+                else:
+                    self._coords.pop(record["id"], None)
+            for rid in removed_ids:
+                self._coords.pop(rid, None)
+            self._snapshot = None
+
+    def _index(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    ids = list(self._coords)
+                    coords = np.array([self._coords[rid] for rid in ids], dtype=np.float64).reshape(-1, 2)
+                    self._snapshot = (ids, GeoIndex(coords[:, 0], coords[:, 1]))
+                snapshot = self._snapshot
+        return snapshot
+
+    def within(self, lat: float, lng: float, radius_km: float) -> list:
+        """[(record id, distance_km)] within radius_km, nearest first."""
+        ids, index = self._index()
+        idx, dist = index.query_radius(lat, lng, radius_km)
+        return [(ids[i], float(d)) for i, d in zip(idx, dist)]
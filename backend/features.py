@@ -0,0 +1,130 @@
+"""
+Feature extraction shared by training (xgboost_model.py) and serving (ml_model.py).
+Text features are computed for whole arrays of strings at once on a UTF-32 code point matrix,
+so training on millions of rows does not go through per-row Python. Rows are grouped by length
+so matrix padding stays small; very long strings take the scalar path.
+"""
+
+import numpy as np
+
+# Feature columns expected by the model
+BASE_FEATURES = ["username_len", "username_sum_ord", "num_digits", "num_letters"]
+DATETIME_FEATURES = [
+    "valid_from_hour", "valid_from_day", "valid_from_month",
+    "valid_to_hour", "valid_to_day", "valid_to_month"
+]
+FEATURE_COLS = BASE_FEATURES + DATETIME_FEATURES
+DATETIME_SOURCE_COLS = ["valid_from", "valid_to"]
+
+# Default datetime values (from training data), used when serving text-only inputs
+DEFAULT_DATETIME = [23, 6, 2, 23, 8, 2]  # hour, day, month for valid_from and valid_to
+
+# Max rows per code point matrix
+CHUNK_ROWS = 100_000
+# Max cells (rows * longest string) per code point matrix; bounds temporary memory to ~13 bytes per cell
+MAX_CHUNK_CELLS = 1 << 22
+# Strings longer than this are counted one by one instead of widening a whole matrix
+MAX_VECTOR_LEN = 4096
+# Below this many strings the plain Python path is faster than building arrays
+_SMALL_BATCH = 8
+
+
+def text_features(text) -> dict:
+    """Reference (scalar) text features for one string. text_feature_matrix matches this exactly (incl. NUL characters)."""
+    s = str(text) if text else ""
+    return {
+        "username_len": len(s),
+        "username_sum_ord": sum(ord(c) for c in s),
+        "num_digits": sum(1 for c in s if c.isdigit()),
+        "num_letters": sum(1 for c in s if c.isalpha()),
+    }
+
+
+def _char_class_tables(codes: np.ndarray):
+    """is_digit / is_alpha lookup for the distinct code points present (str.isdigit/isalpha semantics)."""
+    uniq = np.unique(codes)
+    chars = [chr(c) for c in uniq.tolist()]
+    is_digit = np.fromiter((c.isdigit() for c in chars), dtype=bool, count=len(chars))
+    is_alpha = np.fromiter((c.isalpha() for c in chars), dtype=bool, count=len(chars))
+    return uniq, is_digit, is_alpha
+
+
+def _matrix_chunk(strings) -> np.ndarray:
+    arr = np.asarray(strings, dtype=str)
+    out = np.zeros((len(arr), len(BASE_FEATURES)), dtype=np.int64)
+    width = arr.dtype.itemsize // 4
+    if len(arr) == 0 or width == 0:
+        return out
+    codes = arr.view(np.uint32).reshape(len(arr), width)  # zero-padded code points
+    uniq, is_digit, is_alpha = _char_class_tables(codes)
+    idx = np.searchsorted(uniq, codes)
+
+    out[:, 0] = np.char.str_len(arr)
+    out[:, 1] = codes.sum(axis=1, dtype=np.int64)
+    out[:, 2] = is_digit[idx].sum(axis=1)
+    out[:, 3] = is_alpha[idx].sum(axis=1)
+    return out
+
+
+def _scalar_row(text: str) -> list:
+    f = text_features(text)
+    return [f[k] for k in BASE_FEATURES]
+
+
+def text_feature_matrix(texts) -> np.ndarray:
+    """
+    Vectorized text features for a sequence of strings.
+    Returns an int64 array of shape (n, 4) in BASE_FEATURES order.
+    """
+    texts = [str(t) if t else "" for t in texts]
+    n = len(texts)
+    if n <= _SMALL_BATCH:
+        return np.asarray([_scalar_row(t) for t in texts], dtype=np.int64).reshape(n, len(BASE_FEATURES))
+
+    out = np.empty((n, len(BASE_FEATURES)), dtype=np.int64)
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=n)
+    # NumPy's fixed-width str dtype drops trailing NULs, so those strings are counted exactly in Python
+    scalar = lengths > MAX_VECTOR_LEN
+    if "\x00" in "".join(texts):
+        scalar |= np.fromiter((t[-1:] == "\x00" for t in texts), dtype=bool, count=n)
+    for i in np.flatnonzero(scalar):
+        out[i] = _scalar_row(texts[i])
+
+    # Shortest first, so each matrix is only as wide as the longest string in its own chunk
+    order = np.flatnonzero(~scalar)
+    order = order[np.argsort(lengths[order], kind="stable")]
+    start = 0
+    while start < len(order):
+        end = min(start + CHUNK_ROWS, len(order))
+        while end - start > 1 and (end - start) * lengths[order[end - 1]] > MAX_CHUNK_CELLS:
+            end = start + max(1, MAX_CHUNK_CELLS // int(lengths[order[end - 1]]))
+        rows = order[start:end]
+        out[rows] = _matrix_chunk([texts[i] for i in rows.tolist()])
+        start = end
+    return out
+
+
+def datetime_feature_frame(df):
+    """
+    Hour/day/month features for the valid_from / valid_to columns of a DataFrame.
+    Only columns present (and not all-null) are produced, matching what the model was trained with.
+    """
+    import pandas as pd
+
+    out = pd.DataFrame(index=df.index)
+    for col in DATETIME_SOURCE_COLS:
+        if col in df.columns and df[col].notna().any():
+            dt = pd.to_datetime(df[col], errors="coerce").dt
+            out[f"{col}_hour"] = dt.hour
+            out[f"{col}_day"] = dt.day
+            out[f"{col}_month"] = dt.month
+    return out
+
+
+def build_feature_frame(df, text_col: str = "username"):
+    """Text + datetime features for a training DataFrame; columns follow FEATURE_COLS order."""
+    import pandas as pd
+
+    text = pd.DataFrame(text_feature_matrix(df[text_col].astype(str).tolist()), columns=BASE_FEATURES, index=df.index)
+    frame = pd.concat([text, datetime_feature_frame(df)], axis=1)
+    return frame[[c for c in FEATURE_COLS if c in frame.columns]]
@@ -0,0 +1,119 @@
+"""
+HTTP caching helpers for JSON endpoints.
+Payloads are serialized once with a fast encoder (orjson when installed), tagged with a content
+ETag, pre-compressed (brotli / gzip) when large, and answered with 304 on a matching If-None-Match.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # optional; falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+# Bumped when the response format changes, so clients drop ETags from older builds
+ETAG_VERSION = "v1"
+# Payloads smaller than this are sent uncompressed (compression would not pay off)
+MIN_COMPRESS_SIZE = 1024
+DEFAULT_CACHE_CONTROL = "public, max-age=60, must-revalidate"
+
+
+def dumps(payload) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{ETAG_VERSION}-{hashlib.blake2b(body, digest_size=10).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _accepted_encodings(request: Request) -> set:
+    header = request.headers.get("accept-encoding", "")
+    encodings = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if name and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            encodings.add(name.strip().lower())
+    return encodings
+
+
+class EncodedJSON:
+    """One serialized payload with its ETag and lazily built compressed variants."""
+
+    def __init__(self, payload):
+        self.body = dumps(payload)
+        self.etag = make_etag(self.body)
+        self._variants = {}
+        self._lock = threading.Lock()
+
+    def _variant(self, encoding: str) -> bytes:
+        body = self._variants.get(encoding)
+        if body is None:
+            with self._lock:
+                body = self._variants.get(encoding)
+                if body is None:
+                    if encoding == "br":
+                        body = brotli.compress(self.body, quality=5)
+                    else:
+                        body = gzip.compress(self.body, compresslevel=6)
+                    self._variants[encoding] = body
+        return body
+
+    def response(self, request: Request, cache_control: str = DEFAULT_CACHE_CONTROL, headers: dict = None) -> Response:
+        base_headers = {"ETag": self.etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding", **(headers or {})}
+        if etag_matches(request, self.etag):
+            return Response(status_code=304, headers=base_headers)
+
+        body = self.body
+        if len(body) >= MIN_COMPRESS_SIZE:
+            accepted = _accepted_encodings(request)
+            encoding = "br" if brotli is not None and "br" in accepted else "gzip" if "gzip" in accepted else None
+            if encoding is not None:
+                body = self._variant(encoding)
+                base_headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type="application/json", headers=base_headers)
+
+
+class CachedJSON:
+    """
+    A payload served many times (dashboard constants, precomputed views).
+    Serialized and hashed once; call set() when the underlying data changes.
+    """
+
+    def __init__(self, payload=None):
+        self._encoded = EncodedJSON(payload)
+
+    def set(self, payload):
+        self._encoded = EncodedJSON(payload)
+
+    @property
+    def etag(self) -> str:
+        return self._encoded.etag
+
+    def response(self, request: Request, cache_control: str = DEFAULT_CACHE_CONTROL, headers: dict = None) -> Response:
+        return self._encoded.response(request, cache_control, headers)
+
+
+def json_response(request: Request, payload, cache_control: str = "no-cache", headers: dict = None) -> Response:
+    """Serialize a one-off payload with ETag/304 and compression (no caching of the encoded bytes)."""
+    return EncodedJSON(payload).response(request, cache_control, headers)
@@ -0,0 +1,194 @@
+"""
+Persistent lead store backed by a local SQLite file.
+Enriched leads are stored as JSON with indexed columns for filtering/sorting, and
+queried with keyset (cursor) pagination so page cost does not grow with the table.
+"""
+
+import base64
+import json
+import os
+import sqlite3
+import threading
+from datetime import date
+
+STORE_PATH = os.environ.get("LEAD_STORE_PATH", os.path.join(os.path.dirname(__file__), "leads.db"))
+
+SORT_FIELDS = ("id", "confidence", "ai_score", "industry", "depot")
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leads (
+    id INTEGER PRIMARY KEY,
+    industry TEXT,
+    depot TEXT,
+    confidence REAL,
+    ai_score REAL,
+    gstin TEXT,
+    first_seen TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_leads_industry ON leads (industry, id);
+CREATE INDEX IF NOT EXISTS idx_leads_depot ON leads (depot, id);
+CREATE INDEX IF NOT EXISTS idx_leads_confidence ON leads (confidence, id);
+CREATE INDEX IF NOT EXISTS idx_leads_ai_score ON leads (ai_score, id);
+CREATE INDEX IF NOT EXISTS idx_leads_gstin ON leads (gstin);
+"""
+
+
+def encode_cursor(sort_value, lead_id) -> str:
+    raw = json.dumps([sort_value, lead_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, lead_id = json.loads(base64.urlsafe_b64decode(padded))
+        return sort_value, int(lead_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+class LeadStore:
+    """SQLite-backed lead table. One connection per thread and process (sync endpoints run in a threadpool)."""
+
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(leads)")}
+            if "first_seen" not in columns:
+                # Stores created before first_seen existed: date their leads from the upgrade
+                conn.execute("ALTER TABLE leads ADD COLUMN first_seen TEXT")
+                conn.execute("UPDATE leads SET first_seen = ?", (date.today().isoformat(),))
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        # Never reuse a connection inherited across fork (pre-fork serving imports the app in the master)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def upsert_many(self, leads: list):
+        """Insert or update leads; first_seen is set on insert only, so it survives updates and restarts."""
+        today = date.today().isoformat()
+        rows = [
+            (lead["id"], lead.get("industry"), lead.get("depot"), lead.get("confidence"),
+             lead.get("ai_score"), lead.get("gstin"), today, json.dumps(lead))
+            for lead in leads
+        ]
+        with self._write_lock, self._conn() as conn:
+            conn.executemany(
+                "INSERT INTO leads (id, industry, depot, confidence, ai_score, gstin, first_seen, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET industry=excluded.industry, depot=excluded.depot, "
+                "confidence=excluded.confidence, ai_score=excluded.ai_score, gstin=excluded.gstin, data=excluded.data",
+                rows,
+            )
+
+    def delete_many(self, lead_ids):
+        with self._write_lock, self._conn() as conn:
+            conn.executemany("DELETE FROM leads WHERE id = ?", [(i,) for i in lead_ids])
+
+    def retain(self, lead_ids) -> int:
+        """
+        Delete every stored lead whose id is not in lead_ids; returns the number deleted.
+        The file outlives the process, so leads dropped between runs are only caught by reconciling at startup.
+        """
+        with self._write_lock, self._conn() as conn:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS retain_ids (id INTEGER PRIMARY KEY)")
+            conn.execute("DELETE FROM retain_ids")
+            conn.executemany("INSERT OR IGNORE INTO retain_ids (id) VALUES (?)", [(i,) for i in lead_ids])
+            deleted = conn.execute("DELETE FROM leads WHERE id NOT IN (SELECT id FROM retain_ids)").rowcount
+            conn.execute("DELETE FROM retain_ids")
+        return deleted
+
+    def sync(self, updated: list, removed_ids: list):
+        """LeadView on_update hook: persist re-scored leads and drop removed ones."""
+        if updated:
+            self.upsert_many(updated)
+        if removed_ids:
+            self.delete_many(removed_ids)
+
+    def first_seen(self, lead_ids) -> dict:
+        """{lead id: date the lead was first stored} for the stored ones among lead_ids."""
+        lead_ids = list(lead_ids)
+        found = {}
+        conn = self._conn()
+        for i in range(0, len(lead_ids), 500):
+            batch = lead_ids[i:i + 500]
+            rows = conn.execute(
+                f"SELECT id, first_seen FROM leads WHERE id IN ({', '.join('?' * len(batch))})", batch,
+            ).fetchall()
+            found.update((lead_id, date.fromisoformat(day)) for lead_id, day in rows if day)
+        return found
+
+    def get(self, lead_id: int):
+        row = self._conn().execute("SELECT data FROM leads WHERE id = ?", (lead_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_by_gstin(self, gstin: str) -> list:
+        rows = self._conn().execute("SELECT data FROM leads WHERE gstin = ? ORDER BY id", (gstin,)).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+
+    def query(self, industry=None, depot=None, min_confidence=None, sort="id", order="asc",
+              cursor=None, limit=DEFAULT_LIMIT):
+        """
+        Filtered, sorted page of leads. Returns (leads, next_cursor); next_cursor is None on the last page.
+        Sorting is always tie-broken on id so the (sort value, id) cursor is stable.
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_FIELDS)}")
+        if order not in ("asc", "desc"):
+            raise ValueError("order must be 'asc' or 'desc'")
+        limit = max(1, min(int(limit), MAX_LIMIT))
+
+        where, params = [], []
+        if industry is not None:
+            where.append("industry = ?")
+            params.append(industry)
+        if depot is not None:
+            where.append("depot = ?")
+            params.append(depot)
+        if min_confidence is not None:
+            where.append("confidence >= ?")
+            params.append(min_confidence)
+        if cursor:
+            sort_value, last_id = decode_cursor(cursor)
+            op = ">" if order == "asc" else "<"
+            if sort == "id":
+                where.append(f"id {op} ?")
+                params.append(last_id)
+            elif sort_value is None:
+                # SQLite sorts NULLs first ascending / last descending; a plain comparison with NULL matches nothing
+                if order == "asc":
+                    where.append(f"(({sort} IS NULL AND id > ?) OR {sort} IS NOT NULL)")
+                else:
+                    where.append(f"({sort} IS NULL AND id < ?)")
+                params.append(last_id)
+            else:
+                clause = f"({sort}, id) {op} (?, ?)"
+                where.append(clause if order == "asc" else f"({clause} OR {sort} IS NULL)")
+                params.extend([sort_value, last_id])
+
+        sql = f"SELECT {sort}, id, data FROM leads"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {sort} {order.upper()}, id {order.upper()} LIMIT ?"
+        params.append(limit + 1)
+
+        rows = self._conn().execute(sql, params).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][0], rows[-1][1])
+        return [json.loads(r[2]) for r in rows], next_cursor
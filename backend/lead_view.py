@@ -0,0 +1,67 @@
+"""
+Materialized view of AI-enriched records (leads, dossiers).
+Computed once, then refreshed incrementally: only added/changed records are re-scored,
+and the whole view is rebuilt when the model version changes. Reads never run inference.
+"""
+
+import json
+import threading
+
+
+def _fingerprint(record: dict) -> str:
+    return json.dumps(record, sort_keys=True, default=str)
+
+
+class LeadView:
+    """
+    source_fn() -> {id: raw record} (in display order)
+    enrich_fn(records) -> enriched records, same order (one batched predict)
+    version_fn() -> current model version; a change invalidates every enriched record
+    on_update(updated, removed_ids) -> optional hook called with each refresh's changes (e.g. persistence)
+    """
+
+    def __init__(self, source_fn, enrich_fn, version_fn, on_update=None):
+        self.source_fn = source_fn
+        self.enrich_fn = enrich_fn
+        self.version_fn = version_fn
+        self.on_update = on_update
+        self._lock = threading.Lock()
+        self._version = None
+        self._fingerprints = {}
+        self._by_id = {}
+        self._ordered = []
+        self.rescored = 0  # records re-scored by the last refresh
+
+    def refresh(self) -> int:
+        """Bring the view up to date with the source. Returns the number of records re-scored."""
+        with self._lock:
+            source = self.source_fn()
+            version = self.version_fn()
+            if version != self._version:
+                self._fingerprints = {}
+
+            fingerprints = {rid: _fingerprint(rec) for rid, rec in source.items()}
+            stale = [rid for rid, fp in fingerprints.items() if self._fingerprints.get(rid) != fp]
+
+            stale_ids = set(stale)
+            by_id = {rid: self._by_id[rid] for rid in source if rid not in stale_ids and rid in self._by_id}
+            updated = self.enrich_fn([source[rid] for rid in stale]) if stale else []
+            for rid, enriched in zip(stale, updated):
+                by_id[rid] = enriched
+            removed = [rid for rid in self._by_id if rid not in source]
+            if self.on_update is not None and (updated or removed):
+                self.on_update(updated, removed)
+
+            # Publish a consistent snapshot; readers never see a half-refreshed view
+            self._by_id = by_id
+            self._ordered = [by_id[rid] for rid in source]
+            self._fingerprints = fingerprints
+            self._version = version
+            self.rescored = len(stale)
+            return self.rescored
+
+    def all(self) -> list:
+        return self._ordered
+
+    def get(self, record_id):
+        return self._by_id.get(record_id)
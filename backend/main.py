@@ -2,21 +2,114 @@
 HP-Sentinel Backend - FastAPI + XGBoost Lead Scoring
 """
 
-from fastapi import FastAPI, HTTPException
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
+import asyncio
+import logging
+import os
+import secrets
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 try:
-    from ml_model import predict_confidence, enrich_lead_with_score
+    from ml_model import enrich_leads_with_scores, score_cache_stats, model_version, score_pairs, model_registry, load_native_backend
 except Exception as e:
     # Fallback if XGBoost/model fails (e.g. libomp on Mac)
-    def predict_confidence(company_name: str, signal_text: str = "") -> float:
-        return 75.0  # placeholder
-    def enrich_lead_with_score(lead: dict) -> dict:
-        return {**lead, "confidence": lead.get("confidence", 75), "ai_score": 75.0}
-
-app = FastAPI(title="HP-Sentinel API", description="Verifiable Intelligence Engine for HPCL Sales")
+    def enrich_leads_with_scores(leads: list) -> list:
+        return [{**lead, "confidence": lead.get("confidence", 75), "ai_score": 75.0} for lead in leads]
+    def score_cache_stats() -> dict:
+        return {}
+    def model_version():
+        return None
+    def score_pairs(pairs) -> list:
+        return [{"confidence": 75.0, "model_version": None} for _ in pairs]
+    def load_native_backend(wait: bool = False):
+        pass
+    model_registry = None
+
+import metrics
+import profiler
+from bulk_scoring import UploadStreamingResponse, stream_scores
+from depots import DepotRegistry, LocationIndex
+from analytics import LeadAnalytics
+from http_cache import CachedJSON, json_response
+from lead_store import LeadStore, DEFAULT_LIMIT, MAX_LIMIT, SORT_FIELDS
+from lead_view import LeadView
+from scheduler import InferenceScheduler
+
+# Seconds between background checks for changed leads / a new model file
+LEAD_VIEW_REFRESH_S = float(os.environ.get("LEAD_VIEW_REFRESH_S", "30"))
+
+
+async def _refresh_views_periodically():
+    while True:
+        await asyncio.sleep(LEAD_VIEW_REFRESH_S)
+        try:
+            for view in (leads_view, dossiers_view):
+                await asyncio.to_thread(view.refresh)
+            # Roll the weekly windows over even when no lead changed
+            publish_analytics()
+        except Exception:
+            # e.g. a locked SQLite store or a failing enrich; keep serving the last views and retry next round
+            logger.exception("Lead view refresh failed; retrying in %ss", LEAD_VIEW_REFRESH_S)
+
+
+logger = logging.getLogger("hp_sentinel")
+
+# Startup timings (seconds), reported by /api/ready
+STARTUP_TIMES = {"import": None, "modelLoad": None, "views": None, "startup": None}
+_ready = False
+_views_built = False
+
+
+def build_views():
+    """
+    Materialize enriched leads/dossiers so reads never run inference, and ingest them into the lead store.
+    serve.py runs this once in the master before forking, so workers don't each rewrite the store.
+    """
+    global _views_built
+    views_started = time.perf_counter()
+    leads_view.refresh()
+    dossiers_view.refresh()
+    # The view starts empty, so leads removed while the app was down never show up as removals
+    lead_store.retain([lead["id"] for lead in leads_view.all()])
+    STARTUP_TIMES["views"] = round(time.perf_counter() - views_started, 4)
+    _views_built = True
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _ready
+    started = time.perf_counter()
+    # Load + warm the model before accepting traffic so the first request doesn't pay for it
+    if model_registry is not None:
+        model_registry.active()
+    STARTUP_TIMES["modelLoad"] = round(time.perf_counter() - started, 4)
+    # Under serve.py the master already built the views before forking; workers inherit them
+    if not _views_built:
+        build_views()
+    STARTUP_TIMES["startup"] = round(time.perf_counter() - started, 4)
+    logger.info("Startup timings: %s", STARTUP_TIMES)
+    _ready = True
+    metrics.REGISTRY.start()  # no-op unless METRICS_DIR is set (multi-process serving)
+    refresher = asyncio.create_task(_refresh_views_periodically())
+    if model_registry is not None:
+        model_registry.start()  # hot-reloads new model files in the background
+        load_native_backend()  # SCORE_BACKEND=auto: native xgboost for large batches, loaded in the background
+    yield
+    _ready = False
+    refresher.cancel()
+    if model_registry is not None:
+        model_registry.stop()
+
+app = FastAPI(title="HP-Sentinel API", description="Verifiable Intelligence Engine for HPCL Sales", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,60 +117,107 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
-# ============ Data ============
-KPI_DATA = {
-    "warmEntitiesThisWeek": 47,
-    "highConfidenceLeads": 12,
-    "conversionRate": 31.2,
-    "avgConfidence": 87,
-}
+# Coalesces concurrent /api/score calls into one model.predict per batch
+score_scheduler = InferenceScheduler(score_pairs)
 
-LEADS_OVER_TIME = [
-    {"date": "Week 1", "detected": 120, "certified": 38},
-    {"date": "Week 2", "detected": 135, "certified": 42},
-    {"date": "Week 3", "detected": 98, "certified": 35},
-    {"date": "Week 4", "detected": 156, "certified": 51},
-    {"date": "Week 5", "detected": 142, "certified": 47},
-]
 
-PRODUCT_DEMAND = [
-    {"name": "HSD", "value": 28},
-    {"name": "FO", "value": 22},
-    {"name": "Bitumen", "value": 18},
-    {"name": "Hexane", "value": 15},
-    {"name": "LPG", "value": 12},
-    {"name": "Others", "value": 5},
-]
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template (/api/leads/{lead_id}), not raw path, to keep cardinality bounded
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        metrics.HTTP_LATENCY.observe(time.perf_counter() - started, route=path, method=request.method)
+        metrics.HTTP_REQUESTS.inc(route=path, method=request.method, status=status)
 
-LEAD_STATUS = [
-    {"name": "Detected", "value": 85, "color": "#64748b"},
-    {"name": "Verified", "value": 52, "color": "#3b82f6"},
-    {"name": "Contacted", "value": 28, "color": "#eab308"},
-    {"name": "Converted", "value": 17, "color": "#22c55e"},
-]
 
+def _scheduler_metrics() -> dict:
+    stats = score_scheduler.stats()
+    return {("queue_depth",): stats["queueDepth"], ("in_flight",): stats["inFlight"], ("batches",): stats["batches"], ("items",): stats["items"]}
+
+
+metrics.REGISTRY.gauge("hp_score_scheduler", "Micro-batching scheduler queue depth, in-flight items and totals.", ("stat",), collect_fn=_scheduler_metrics)
+
+# ============ Data ============
 LEADS_RAW = [
-    {"id": 1, "company": "ABC Power Solutions Pvt. Ltd.", "industry": "Power", "confidence": 92, "signal": "EC Filing – 5 MW Captive Power (Jan 2026)", "products": ["Furnace Oil (~40 KL/month)"], "productFit": "Furnace Oil (~40 KL/month)", "depot": "Panipat Depot", "depotDistance": "12 km", "verified": {"signal": True, "legal": True, "geo": True}, "gstin": "27AABCU9603R1ZM"},
-    {"id": 2, "company": "XYZ Construction & Infra Ltd.", "industry": "Infrastructure", "confidence": 88, "signal": "PCB Approval – Bitumen Plant Expansion", "products": ["Bitumen", "HSD"], "productFit": "Bitumen, HSD", "depot": "Delhi Depot", "depotDistance": "8 km", "verified": {"signal": True, "legal": True, "geo": True}, "gstin": "07AAACX1234K1Z5"},
-    {"id": 3, "company": "Reliance Petrochemicals", "industry": "Petrochemicals", "confidence": 95, "signal": "EC Filing – Refinery Expansion Gujarat", "products": ["HSD", "FO", "Hexane"], "productFit": "HSD, FO, Hexane", "depot": "Vadodara Depot", "depotDistance": "18 km", "verified": {"signal": True, "legal": True, "geo": True}, "gstin": "24AABCR5055M1ZV"},
-    {"id": 4, "company": "Adani Ports & SEZ Ltd.", "industry": "Shipping", "confidence": 89, "signal": "Marine Fuel Tender – Mundra Port", "products": ["HSD", "FO"], "productFit": "HSD, FO", "depot": "Mundra Depot", "depotDistance": "5 km", "verified": {"signal": True, "legal": True, "geo": True}, "gstin": "24AAACA2729K1Z8"},
-    {"id": 5, "company": "NHAI - Project Division", "industry": "Infrastructure", "confidence": 84, "signal": "Annual Bitumen Procurement Tender", "products": ["Bitumen"], "productFit": "Bitumen", "depot": "Panipat Depot", "depotDistance": "22 km", "verified": {"signal": True, "legal": True, "geo": True}, "gstin": "09AAAGN0171N1ZE"},
-    {"id": 6, "company": "Tata Steel Captive Power", "industry": "Power", "confidence": 78, "signal": "Boiler Capacity Upgrade – EC Amendment", "products": ["FO", "LPG"], "productFit": "FO, LPG", "depot": "Jamshedpur Depot", "depotDistance": "15 km", "verified": {"signal": True, "legal": True, "geo": True}, "gstin": "20AABCT3518Q1ZV"},
+    {"id": 1, "company": "ABC Power Solutions Pvt. Ltd.", "industry": "Power", "confidence": 92, "signal": "EC Filing – 5 MW Captive Power (Jan 2026)", "products": ["Furnace Oil (~40 KL/month)"], "productFit": "Furnace Oil (~40 KL/month)", "lat": 28.9931, "lng": 77.0151, "verified": {"signal": True, "legal": True, "geo": True}, "gstin": "27AABCU9603R1ZM", "status": "Contacted"},
+    {"id": 2, "company": "XYZ Construction & Infra Ltd.", "industry": "Infrastructure", "confidence": 88, "signal": "PCB Approval – Bitumen Plant Expansion", "products": ["Bitumen", "HSD"], "productFit": "Bitumen, HSD", "lat": 28.5355, "lng": 77.391, "verified": {"signal": True, "legal": True, "geo": True}, "gstin": "07AAACX1234K1Z5", "status": "Verified"},
+    {"id": 3, "company": "Reliance Petrochemicals", "industry": "Petrochemicals", "confidence": 95, "signal": "EC Filing – Refinery Expansion Gujarat", "products": ["HSD", "FO", "Hexane"], "productFit": "HSD, FO, Hexane", "lat": 22.3072, "lng": 73.1812, "verified": {"signal": True, "legal": True, "geo": True}, "gstin": "24AABCR5055M1ZV", "status": "Converted"},
+    {"id": 4, "company": "Adani Ports & SEZ Ltd.", "industry": "Shipping", "confidence": 89, "signal": "Marine Fuel Tender – Mundra Port", "products": ["HSD", "FO"], "productFit": "HSD, FO", "lat": 22.839, "lng": 69.721, "verified": {"signal": True, "legal": True, "geo": True}, "gstin": "24AAACA2729K1Z8", "status": "Contacted"},
+    {"id": 5, "company": "NHAI - Project Division", "industry": "Infrastructure", "confidence": 84, "signal": "Annual Bitumen Procurement Tender", "products": ["Bitumen"], "productFit": "Bitumen", "lat": 29.3909, "lng": 76.9635, "verified": {"signal": True, "legal": True, "geo": True}, "gstin": "09AAAGN0171N1ZE", "status": "Verified"},
+    {"id": 6, "company": "Tata Steel Captive Power", "industry": "Power", "confidence": 78, "signal": "Boiler Capacity Upgrade – EC Amendment", "products": ["FO", "LPG"], "productFit": "FO, LPG", "lat": 22.8046, "lng": 86.2029, "verified": {"signal": True, "legal": True, "geo": True}, "gstin": "20AABCT3518Q1ZV", "status": "Detected"},
 ]
 
 LEAD_DOSSIERS = {
-    1: {"id": 1, "company": "ABC Power Solutions Pvt. Ltd.", "industry": "Power", "gstin": "27AABCU9603R1ZM", "location": "Sonipat, Haryana", "signal": "EC Filing – 5 MW Captive Power (Jan 2026)", "confidence": 92, "productFit": "Furnace Oil (~40 KL/month)", "depot": "Panipat HPCL Depot", "depotDistance": "12 km", "procurementHint": "Tender expected in ~15 days", "whyLead": "EC filing confirms 10 TPH Husk-Fired Boiler commissioning Q1 2026. Power capacity 5 MW. Legal entity verified via GSTIN with 18+ months active filing. Depot feasibility confirmed within service radius.", "products": [{"name": "Furnace Oil", "confidence": 95, "reason": "Boiler specification, 40 KL/month estimated"}, {"name": "HSD", "confidence": 72, "reason": "Backup generator capacity"}]},
-    2: {"id": 2, "company": "XYZ Construction & Infra Ltd.", "industry": "Infrastructure", "gstin": "07AAACX1234K1Z5", "location": "Noida, Uttar Pradesh", "signal": "PCB Approval – Bitumen Plant Expansion", "confidence": 88, "productFit": "Bitumen, HSD", "depot": "Delhi HPCL Depot", "depotDistance": "8 km", "procurementHint": "Project kickoff in 30 days", "whyLead": "State PCB approval for bitumen mixing plant expansion. Company has verified GSTIN, active filings. Depot delivery feasible.", "products": [{"name": "Bitumen", "confidence": 92, "reason": "Plant expansion scope"}, {"name": "HSD", "confidence": 65, "reason": "Site equipment fuel"}]},
-    3: {"id": 3, "company": "Reliance Petrochemicals", "industry": "Petrochemicals", "gstin": "24AABCR5055M1ZV", "location": "Vadodara, Gujarat", "signal": "EC Filing – Refinery Expansion Gujarat", "confidence": 95, "productFit": "HSD, FO, Hexane", "depot": "Vadodara HPCL Depot", "depotDistance": "18 km", "procurementHint": "Ongoing procurement cycle", "whyLead": "Recent tender for 50,000 MT HSD. Active expansion in Gujarat refinery. Legal entity verified.", "products": [{"name": "HSD", "confidence": 95, "reason": "Tender published, high volume"}, {"name": "FO", "confidence": 82, "reason": "Refinery operations"}, {"name": "Hexane", "confidence": 78, "reason": "Solvent extraction unit"}]},
-    4: {"id": 4, "company": "Adani Ports & SEZ Ltd.", "industry": "Shipping", "gstin": "24AAACA2729K1Z8", "location": "Mundra, Gujarat", "signal": "Marine Fuel Tender – Mundra Port", "confidence": 89, "productFit": "HSD, FO", "depot": "Mundra HPCL Depot", "depotDistance": "5 km", "procurementHint": "Tender closing in 10 days", "whyLead": "Marine fuel bunkering tender for port operations. Legal entity verified. Depot co-located with port.", "products": [{"name": "HSD", "confidence": 88, "reason": "Marine fuel specifications"}, {"name": "FO", "confidence": 85, "reason": "Bunker fuel demand"}]},
-    5: {"id": 5, "company": "NHAI - Project Division", "industry": "Infrastructure", "gstin": "09AAAGN0171N1ZE", "location": "Panipat, Haryana", "signal": "Annual Bitumen Procurement Tender", "confidence": 84, "productFit": "Bitumen", "depot": "Panipat HPCL Depot", "depotDistance": "22 km", "procurementHint": "FY26 tender cycle", "whyLead": "Annual bitumen procurement for highway projects. Government entity, verified.", "products": [{"name": "Bitumen", "confidence": 94, "reason": "Tender scope"}]},
-    6: {"id": 6, "company": "Tata Steel Captive Power", "industry": "Power", "gstin": "20AABCT3518Q1ZV", "location": "Jamshedpur, Jharkhand", "signal": "Boiler Capacity Upgrade – EC Amendment", "confidence": 78, "productFit": "FO, LPG", "depot": "Jamshedpur HPCL Depot", "depotDistance": "15 km", "procurementHint": "Upgrade completion Q2 2026", "whyLead": "EC amendment for boiler capacity increase. Tata Group entity, strong credit profile.", "products": [{"name": "FO", "confidence": 82, "reason": "Boiler fuel"}, {"name": "LPG", "confidence": 68, "reason": "Ancillary operations"}]},
+    1: {"id": 1, "company": "ABC Power Solutions Pvt. Ltd.", "industry": "Power", "gstin": "27AABCU9603R1ZM", "location": "Sonipat, Haryana", "signal": "EC Filing – 5 MW Captive Power (Jan 2026)", "confidence": 92, "productFit": "Furnace Oil (~40 KL/month)", "lat": 28.9931, "lng": 77.0151, "procurementHint": "Tender expected in ~15 days", "whyLead": "EC filing confirms 10 TPH Husk-Fired Boiler commissioning Q1 2026. Power capacity 5 MW. Legal entity verified via GSTIN with 18+ months active filing. Depot feasibility confirmed within service radius.", "products": [{"name": "Furnace Oil", "confidence": 95, "reason": "Boiler specification, 40 KL/month estimated"}, {"name": "HSD", "confidence": 72, "reason": "Backup generator capacity"}]},
+    2: {"id": 2, "company": "XYZ Construction & Infra Ltd.", "industry": "Infrastructure", "gstin": "07AAACX1234K1Z5", "location": "Noida, Uttar Pradesh", "signal": "PCB Approval – Bitumen Plant Expansion", "confidence": 88, "productFit": "Bitumen, HSD", "lat": 28.5355, "lng": 77.391, "procurementHint": "Project kickoff in 30 days", "whyLead": "State PCB approval for bitumen mixing plant expansion. Company has verified GSTIN, active filings. Depot delivery feasible.", "products": [{"name": "Bitumen", "confidence": 92, "reason": "Plant expansion scope"}, {"name": "HSD", "confidence": 65, "reason": "Site equipment fuel"}]},
+    3: {"id": 3, "company": "Reliance Petrochemicals", "industry": "Petrochemicals", "gstin": "24AABCR5055M1ZV", "location": "Vadodara, Gujarat", "signal": "EC Filing – Refinery Expansion Gujarat", "confidence": 95, "productFit": "HSD, FO, Hexane", "lat": 22.3072, "lng": 73.1812, "procurementHint": "Ongoing procurement cycle", "whyLead": "Recent tender for 50,000 MT HSD. Active expansion in Gujarat refinery. Legal entity verified.", "products": [{"name": "HSD", "confidence": 95, "reason": "Tender published, high volume"}, {"name": "FO", "confidence": 82, "reason": "Refinery operations"}, {"name": "Hexane", "confidence": 78, "reason": "Solvent extraction unit"}]},
+    4: {"id": 4, "company": "Adani Ports & SEZ Ltd.", "industry": "Shipping", "gstin": "24AAACA2729K1Z8", "location": "Mundra, Gujarat", "signal": "Marine Fuel Tender – Mundra Port", "confidence": 89, "productFit": "HSD, FO", "lat": 22.839, "lng": 69.721, "procurementHint": "Tender closing in 10 days", "whyLead": "Marine fuel bunkering tender for port operations. Legal entity verified. Depot co-located with port.", "products": [{"name": "HSD", "confidence": 88, "reason": "Marine fuel specifications"}, {"name": "FO", "confidence": 85, "reason": "Bunker fuel demand"}]},
+    5: {"id": 5, "company": "NHAI - Project Division", "industry": "Infrastructure", "gstin": "09AAAGN0171N1ZE", "location": "Panipat, Haryana", "signal": "Annual Bitumen Procurement Tender", "confidence": 84, "productFit": "Bitumen", "lat": 29.3909, "lng": 76.9635, "procurementHint": "FY26 tender cycle", "whyLead": "Annual bitumen procurement for highway projects. Government entity, verified.", "products": [{"name": "Bitumen", "confidence": 94, "reason": "Tender scope"}]},
+    6: {"id": 6, "company": "Tata Steel Captive Power", "industry": "Power", "gstin": "20AABCT3518Q1ZV", "location": "Jamshedpur, Jharkhand", "signal": "Boiler Capacity Upgrade – EC Amendment", "confidence": 78, "productFit": "FO, LPG", "lat": 22.8046, "lng": 86.2029, "procurementHint": "Upgrade completion Q2 2026", "whyLead": "EC amendment for boiler capacity increase. Tata Group entity, strong credit profile.", "products": [{"name": "FO", "confidence": 82, "reason": "Boiler fuel"}, {"name": "LPG", "confidence": 68, "reason": "Ancillary operations"}]},
 }
 
-FUNNEL_DATA = [{"stage": "Detected", "count": 120}, {"stage": "Verified", "count": 85}, {"stage": "Contacted", "count": 52}, {"stage": "Converted", "count": 28}]
-SECTOR_DATA = [{"name": "Petrochemicals", "count": 32}, {"name": "Power", "count": 28}, {"name": "Transport", "count": 24}, {"name": "Shipping", "count": 18}, {"name": "Infrastructure", "count": 15}]
+# Nearest-depot assignment (see depots.py); runs in the views' enrich step, so added or changed leads get a depot too
+depot_registry = DepotRegistry()
+
+
+def enrich_leads(leads: list) -> list:
+    """Batched nearest-depot assignment + AI scores for added/changed leads."""
+    return enrich_leads_with_scores(depot_registry.assign(leads))
+
+
+def enrich_dossiers(dossiers: list) -> list:
+    return enrich_leads_with_scores(depot_registry.assign(dossiers, name_field="fullName", k=3))
+
+
+# Lead locations for "leads within X km of a depot" radius queries
+lead_locations = LocationIndex()
+
+
+# Indexed SQLite store that /api/leads pages through (see lead_store.py)
+lead_store = LeadStore()
+
+# Incremental counters behind the dashboard / analytics endpoints (see analytics.py)
+lead_analytics = LeadAnalytics(first_seen_fn=lead_store.first_seen)
+
+# Dashboard payloads are serialized, hashed and compressed once per analytics change instead of on every request
+kpis_cache = CachedJSON()
+leads_over_time_cache = CachedJSON()
+product_demand_cache = CachedJSON()
+lead_status_cache = CachedJSON()
+funnel_cache = CachedJSON()
+sectors_cache = CachedJSON()
+
+
+def publish_analytics():
+    kpis_cache.set(lead_analytics.kpis())
+    leads_over_time_cache.set(lead_analytics.leads_over_time())
+    product_demand_cache.set(lead_analytics.product_demand())
+    lead_status_cache.set(lead_analytics.lead_status())
+    funnel_cache.set(lead_analytics.funnel())
+    sectors_cache.set(lead_analytics.sectors())
+
+
+def _on_leads_updated(updated: list, removed_ids: list):
+    """Persist re-scored / removed leads, fold them into the analytics counters and the location index."""
+    lead_store.sync(updated, removed_ids)
+    lead_locations.update(updated, removed_ids)
+    lead_analytics.apply(updated, removed_ids)
+    publish_analytics()
+
+
+# Precomputed AI-enriched views over LEADS_RAW / LEAD_DOSSIERS (see lead_view.py); lead changes go to _on_leads_updated
+leads_view = LeadView(lambda: {lead["id"]: lead for lead in LEADS_RAW}, enrich_leads, model_version, on_update=_on_leads_updated)
+dossiers_view = LeadView(lambda: dict(LEAD_DOSSIERS), enrich_dossiers, model_version)
 
 
 # ============ Endpoints ============
@@ -87,53 +227,105 @@ def root():
     return {"message": "HP-Sentinel API", "version": "1.0"}
 
 
+@app.get("/api/ready")
+def readiness():
+    """Readiness probe: 200 once the model is warmed and views are built, 503 before that."""
+    body = {"ready": _ready, "model_version": model_version() if _ready else None, "timings": STARTUP_TIMES}
+    if not _ready:
+        return JSONResponse(body, status_code=503)
+    return body
+
+
 @app.get("/api/kpis")
-def get_kpis():
-    return KPI_DATA
+def get_kpis(request: Request):
+    return kpis_cache.response(request)
 
 
 @app.get("/api/leads-over-time")
-def get_leads_over_time():
-    return LEADS_OVER_TIME
+def get_leads_over_time(request: Request):
+    return leads_over_time_cache.response(request)
 
 
 @app.get("/api/product-demand")
-def get_product_demand():
-    return PRODUCT_DEMAND
+def get_product_demand(request: Request):
+    return product_demand_cache.response(request)
 
 
 @app.get("/api/lead-status")
-def get_lead_status():
-    return LEAD_STATUS
+def get_lead_status(request: Request):
+    return lead_status_cache.response(request)
 
 
 @app.get("/api/leads")
-def get_leads():
-    """Returns warm entities enriched with AI confidence scores from XGBoost model."""
-    enriched = [enrich_lead_with_score(lead) for lead in LEADS_RAW]
-    return enriched
+def get_leads(
+    request: Request,
+    industry: Optional[str] = None,
+    depot: Optional[str] = None,
+    min_confidence: Optional[float] = None,
+    sort: str = "id",
+    order: str = "asc",
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+):
+    """
+    Returns warm entities enriched with AI confidence scores from XGBoost model.
+    Filtered, sorted and paginated in the lead store; the next page's cursor is in the X-Next-Cursor header.
+    """
+    if sort not in SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(SORT_FIELDS)}")
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be 'asc' or 'desc'")
+    try:
+        leads, next_cursor = lead_store.query(industry, depot, min_confidence, sort, order, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return json_response(request, leads, headers=headers)
 
 
 @app.get("/api/leads/{lead_id}")
-def get_lead_dossier(lead_id: int):
-    if lead_id not in LEAD_DOSSIERS:
+def get_lead_dossier(lead_id: int, request: Request):
+    dossier = dossiers_view.get(lead_id)
+    if dossier is None:
         raise HTTPException(status_code=404, detail="Lead not found")
-    dossier = dict(LEAD_DOSSIERS[lead_id])
-    # Enrich with AI score
-    ai_confidence = predict_confidence(dossier["company"], dossier.get("signal", ""))
-    dossier["ai_score"] = ai_confidence
-    dossier["confidence"] = round(0.7 * ai_confidence + 0.3 * dossier["confidence"], 1)
-    return dossier
+    return json_response(request, dossier)
 
 
 @app.get("/api/analytics/funnel")
-def get_funnel():
-    return FUNNEL_DATA
+def get_funnel(request: Request):
+    return funnel_cache.response(request)
 
 
 @app.get("/api/analytics/sectors")
-def get_sectors():
-    return SECTOR_DATA
+def get_sectors(request: Request):
+    return sectors_cache.response(request)
+
+
+@app.get("/api/depots")
+def list_depots():
+    """Registered depots with coordinates."""
+    return depot_registry.list()
+
+
+@app.get("/api/depots/nearest")
+def nearest_depots(lat: float = Query(..., ge=-90, le=90), lng: float = Query(..., ge=-180, le=180), k: int = Query(1, ge=1, le=50)):
+    """The k nearest depots to a location, nearest first."""
+    idx, dist = depot_registry.nearest([lat], [lng], k)
+    return [{**depot_registry.depots[i], "distanceKm": round(float(d), 1)} for i, d in zip(idx[0], dist[0])]
+
+
+@app.get("/api/depots/{depot_id}/leads")
+def get_depot_leads(depot_id: str, radius_km: float = Query(50.0, gt=0, le=5000)):
+    """Leads within radius_km of a depot (spatial index radius query), nearest first, with their distance."""
+    depot = depot_registry.get(depot_id)
+    if depot is None:
+        raise HTTPException(status_code=404, detail="Depot not found")
+    leads = []
+    for lead_id, km in lead_locations.within(depot["lat"], depot["lng"], radius_km):
+        lead = leads_view.get(lead_id)
+        if lead is not None:
+            leads.append({**lead, "distanceKm": round(km, 1)})
+    return leads
 
 
 class ScoreRequest(BaseModel):
@@ -142,10 +334,131 @@ class ScoreRequest(BaseModel):
 
 
 @app.post("/api/score")
-def predict_score(req: ScoreRequest):
-    """Predict confidence score using XGBoost model."""
-    score = predict_confidence(req.company_name, req.signal_text)
-    return {"company_name": req.company_name, "confidence": score}
+async def predict_score(req: ScoreRequest):
+    """Predict confidence score using XGBoost model (micro-batched with concurrent requests)."""
+    result = await score_scheduler.submit(req.company_name, req.signal_text)
+    return {"company_name": req.company_name, **result}
+
+
+class BatchScoreRequest(BaseModel):
+    items: List[ScoreRequest]
+
+
+@app.post("/api/score/batch")
+def predict_score_batch(req: BatchScoreRequest):
+    """Score many company/signal pairs with a single vectorized model.predict. Order is preserved."""
+    results = score_pairs([(item.company_name, item.signal_text) for item in req.items])
+    return [
+        {"company_name": item.company_name, **result}
+        for item, result in zip(req.items, results)
+    ]
+
+
+@app.post("/api/score/stream")
+async def predict_score_stream(request: Request, format: Optional[str] = None):
+    """
+    Bulk-score a CSV (header: company_name, signal_text) or NDJSON upload.
+    Rows are parsed as they arrive and scored in chunks; results stream back as NDJSON in input order.
+    """
+    fmt = format or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")
+    if fmt not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'csv' or 'ndjson'")
+    return UploadStreamingResponse(
+        stream_scores(request.stream(), fmt, score_pairs),
+        media_type="application/x-ndjson",
+    )
+
+
+@app.get("/api/score/stats")
+def get_score_stats():
+    """Micro-batching scheduler stats: queue depth and batch sizes (of the answering worker process)."""
+    return {**score_scheduler.stats(), "worker": os.getpid()}
+
+
+@app.get("/api/score/cache")
+def get_score_cache_stats():
+    """LRU score cache stats: size and hit/miss counts (of the answering worker process)."""
+    return {**score_cache_stats(), "worker": os.getpid()}
+
+
+# ============ Admin: model registry ============
+
+def _require_registry():
+    if model_registry is None:
+        raise HTTPException(status_code=503, detail="Model registry unavailable")
+    return model_registry
+
+
+# Bearer token for the endpoints that change which model serves; unset disables them
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
+
+def _require_admin(request: Request):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Model pinning disabled (set ADMIN_TOKEN)")
+    supplied = request.headers.get("authorization", "")
+    if not secrets.compare_digest(supplied.encode(), f"Bearer {ADMIN_TOKEN}".encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token", headers={"WWW-Authenticate": "Bearer"})
+
+
+@app.get("/api/admin/models")
+def list_models():
+    """Known model versions, with the active and pinned ones flagged."""
+    return _require_registry().list_versions()
+
+
+class PinRequest(BaseModel):
+    version: str
+
+
+@app.post("/api/admin/models/pin")
+def pin_model(req: PinRequest, request: Request):
+    """
+    Pin a model version; it is loaded and warmed before it starts serving.
+    Requires ADMIN_TOKEN (Authorization: Bearer <token>).
+    """
+    _require_admin(request)
+    registry = _require_registry()
+    try:
+        registry.pin(req.version)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Model version not found")
+    return registry.list_versions()
+
+
+@app.delete("/api/admin/models/pin")
+def unpin_model(request: Request):
+    """Go back to serving the newest model version. Requires ADMIN_TOKEN (Authorization: Bearer <token>)."""
+    _require_admin(request)
+    registry = _require_registry()
+    registry.unpin()
+    return registry.list_versions()
+
+
+# ============ Observability ============
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Prometheus text exposition: request counts/latency, feature/predict timings, batch sizes, cache and model load."""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/admin/profile", response_class=PlainTextResponse)
+async def profile(seconds: float = 5.0, interval_ms: float = 5.0, include_idle: bool = False):
+    """
+    Sample all Python stacks for `seconds` while traffic runs and return folded stacks
+    (feed to flamegraph.pl or speedscope). Requires PROFILER_ENABLED=1.
+    """
+    if not profiler.PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiler disabled (set PROFILER_ENABLED=1)")
+    try:
+        folded = await asyncio.to_thread(profiler.sample_stacks, seconds, interval_ms, include_idle)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(folded)
+
+
+STARTUP_TIMES["import"] = round(time.perf_counter() - _IMPORT_STARTED, 4)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,292 @@
+"""
+Minimal in-process metrics (counters, gauges, histograms) rendered in Prometheus text format.
+No external dependency; every instrument is thread-safe so the threadpool, the scheduler and
+background refreshers can all record into it.
+
+With METRICS_DIR set (serve.py sets it for its workers), each process writes a snapshot of its
+instruments to that directory, and a scrape answered by any process renders all of them: counters
+and histograms summed over every process that ever wrote (so totals stay monotonic when a worker is
+recycled), gauges per live process with a `worker` label.
+"""
+
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Shared snapshot directory for multi-process serving; unset = this process only
+METRICS_DIR = os.environ.get("METRICS_DIR") or None
+# Seconds between snapshot writes of each process when METRICS_DIR is set
+METRICS_FLUSH_S = float(os.environ.get("METRICS_FLUSH_S", "5"))
+
+# Seconds; covers microsecond cache hits up to multi-second bulk requests
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384, 65536)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_str(labelnames, values, extra=None) -> str:
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _fmt(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(n, "") for n in self.labelnames)
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def snapshot(self) -> list:
+        """[(label values, value)] recorded so far."""
+        with self._lock:
+            return list(self._values.items())
+
+    def render_items(self, items, labelnames=None) -> list:
+        labelnames = self.labelnames if labelnames is None else labelnames
+        return self.header() + [f"{self.name}{_label_str(labelnames, k)} {_fmt(v)}" for k, v in items]
+
+    def render(self) -> list:
+        return self.render_items(self.snapshot())
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Set directly, or pass collect_fn() -> {label tuple: value} to read the value at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames=(), collect_fn=None):
+        super().__init__(name, help_text, labelnames)
+        self.collect_fn = collect_fn
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def snapshot(self) -> list:
+        if self.collect_fn is not None:
+            return list(self.collect_fn().items())
+        return super().snapshot()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return [(k, (list(s[0]), s[1], s[2])) for k, s in self._values.items()]
+
+    def render_items(self, items, labelnames=None) -> list:
+        labelnames = self.labelnames if labelnames is None else labelnames
+        lines = self.header()
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_label_str(labelnames, key, ('le', _fmt(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_str(labelnames, key)} {_fmt(total)}")
+            lines.append(f"{self.name}_count{_label_str(labelnames, key)} {count}")
+        return lines
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _merge(metric, snapshots) -> list:
+    """Sum one counter / histogram over every process's snapshot."""
+    totals = {}
+    for values in snapshots:
+        for key, value in values.get(metric.name, ()):
+            key = tuple(key)
+            current = totals.get(key)
+            if current is None:
+                totals[key] = value
+            elif isinstance(metric, Histogram):
+                totals[key] = ([a + b for a, b in zip(current[0], value[0])], current[1] + value[1], current[2] + value[2])
+            else:
+                totals[key] = current + value
+    return list(totals.items())
+
+
+class Registry:
+    def __init__(self, shared_dir=METRICS_DIR):
+        self._metrics = []
+        self._lock = threading.Lock()
+        self.shared_dir = shared_dir
+        self._flusher = None
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()) -> Counter:
+        return self.register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=(), collect_fn=None) -> Gauge:
+        return self.register(Gauge(name, help_text, labelnames, collect_fn))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def _snapshot(self, metrics) -> dict:
+        values = {}
+        for metric in metrics:
+            try:
+                values[metric.name] = metric.snapshot()
+            except Exception:
+                # A failing collect_fn must not break the whole scrape
+                continue
+        return values
+
+    # ---- multi-process sharing ----
+
+    def flush(self) -> None:
+        """Write this process's snapshot to shared_dir (atomically; readers never see a partial file)."""
+        if self.shared_dir is None:
+            return
+        with self._lock:
+            metrics = list(self._metrics)
+        path = os.path.join(self.shared_dir, f"{os.getpid()}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._snapshot(metrics), f)
+        os.replace(tmp, path)
+
+    def start(self) -> None:
+        """Start writing snapshots every METRICS_FLUSH_S (and at exit) when shared_dir is set. Call per process."""
+        if self.shared_dir is None or (self._flusher is not None and self._flusher.is_alive()):
+            return
+        os.makedirs(self.shared_dir, exist_ok=True)
+        self.flush()
+        atexit.register(self.flush)
+        self._flusher = threading.Thread(target=self._flush_periodically, name="metrics-flush", daemon=True)
+        self._flusher.start()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(METRICS_FLUSH_S)
+            try:
+                self.flush()
+            except OSError:
+                continue
+
+    def _read_shared(self) -> dict:
+        """pid -> snapshot for every other process that wrote to shared_dir."""
+        snapshots = {}
+        for path in glob.glob(os.path.join(self.shared_dir, "*.json")):
+            try:
+                pid = int(os.path.splitext(os.path.basename(path))[0])
+                if pid == os.getpid():
+                    continue
+                with open(path) as f:
+                    snapshots[pid] = json.load(f)
+            except (ValueError, OSError):
+                continue
+        return snapshots
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+        if self.shared_dir is None:
+            lines = []
+            for metric in metrics:
+                try:
+                    lines.extend(metric.render())
+                except Exception:
+                    # A failing collect_fn must not break the whole scrape
+                    continue
+            return "\n".join(lines) + "\n"
+
+        snapshots = self._read_shared()
+        snapshots[os.getpid()] = self._snapshot(metrics)
+        live = {pid: values for pid, values in snapshots.items() if pid == os.getpid() or _pid_alive(pid)}
+        lines = []
+        for metric in metrics:
+            if isinstance(metric, Gauge):
+                items = [
+                    (tuple(key) + (pid,), value)
+                    for pid, values in sorted(live.items()) for key, value in values.get(metric.name, ())
+                ]
+                lines.extend(metric.render_items(items, metric.labelnames + ("worker",)))
+            else:
+                lines.extend(metric.render_items(_merge(metric, snapshots.values())))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# ---- Instruments shared across modules ----
+HTTP_REQUESTS = REGISTRY.counter("hp_http_requests_total", "HTTP requests by route, method and status.", ("route", "method", "status"))
+HTTP_LATENCY = REGISTRY.histogram("hp_http_request_duration_seconds", "HTTP request latency (until response headers) by route.", ("route", "method"))
+FEATURE_SECONDS = REGISTRY.histogram("hp_feature_extraction_seconds", "Time spent extracting text features per scoring batch.")
+PREDICT_SECONDS = REGISTRY.histogram("hp_model_predict_seconds", "Time spent in model.predict per batch.", ("backend",))
+PREDICT_BATCH_SIZE = REGISTRY.histogram("hp_model_predict_batch_rows", "Rows per model.predict call (cache misses only).", buckets=SIZE_BUCKETS)
+SCORE_BATCH_SIZE = REGISTRY.histogram("hp_score_batch_pairs", "Pairs per scoring call, before the cache.", buckets=SIZE_BUCKETS)
+MODEL_LOAD_SECONDS = REGISTRY.gauge("hp_model_load_seconds", "Duration of the last model load.", ("backend",))
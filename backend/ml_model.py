@@ -3,81 +3,251 @@ Lead scoring model - uses XGBoost trained on entity features.
 Extracts features from company name + signal text, outputs confidence score 0-100.
 """
 
+import logging
 import os
+import threading
+import time
 import numpy as np
-import pandas as pd
-import xgboost as xgb
 
-# Path to model (relative to backend/)
+import metrics
+
+from features import BASE_FEATURES, FEATURE_COLS, DEFAULT_DATETIME, text_feature_matrix
+from model_registry import ModelRegistry
+from score_cache import ScoreCache
+from tree_compiler import CompiledForest, compile_model
+
+# Path to model (relative to backend/); a UBJSON copy saved alongside it is used by the xgboost backend
 MODEL_PATH = os.path.join(os.path.dirname(__file__), "..", "xgboost_guest_model.json")
+MODEL_UBJ_PATH = os.path.splitext(MODEL_PATH)[0] + ".ubj"
 
-# Feature columns expected by the model (from xgboost_model.py)
-BASE_FEATURES = ["username_len", "username_sum_ord", "num_digits", "num_letters"]
-DATETIME_FEATURES = [
-    "valid_from_hour", "valid_from_day", "valid_from_month",
-    "valid_to_hour", "valid_to_day", "valid_to_month"
-]
-FEATURE_COLS = BASE_FEATURES + DATETIME_FEATURES
+# Additional versioned model files (*.json / *.ubj); the newest one is served unless a version is pinned
+MODEL_DIR = os.environ.get("MODEL_DIR", os.path.join(os.path.dirname(__file__), "..", "models"))
+MODEL_POLL_S = float(os.environ.get("MODEL_POLL_S", "10"))
 
-# Default datetime values (from training data)
-DEFAULT_DATETIME = [23, 6, 2, 23, 8, 2]  # hour, day, month for valid_from and valid_to
+# Inference backend: "auto" (compiled evaluator for small batches and until xgboost is loaded off the
+# request path, then native xgboost from SCORE_NATIVE_MIN_ROWS rows; compiled only if xgboost is missing),
+# "compiled" (NumPy tree evaluator only; no xgboost/pandas import) or "xgboost" (native library only).
+# Measured on xgboost_guest_model: compiled 0.14 ms vs native 1.4 ms for 1 row, 0.76 vs 0.71 ms for 64,
+# 11 vs 4.2 ms for 1,000, 188 vs 34 ms for 10,000 and 2.6 vs 0.36 s for 100,000; importing xgboost takes ~2.4 s.
+SCORE_BACKEND = os.environ.get("SCORE_BACKEND", "auto")
+SCORE_NATIVE_MIN_ROWS = int(os.environ.get("SCORE_NATIVE_MIN_ROWS", "256"))
 
-_model = None
+logger = logging.getLogger(__name__)
 
+_score_cache = ScoreCache()
 
-def _extract_text_features(text: str) -> dict:
-    """Extract same features as xgboost_model.py from any string (company name, signal)."""
-    s = str(text) if text else ""
-    return {
-        "username_len": len(s),
-        "username_sum_ord": sum(ord(c) for c in s),
-        "num_digits": sum(1 for c in s if c.isdigit()),
-        "num_letters": sum(1 for c in s if c.isalpha()),
-    }
 
+class HybridModel:
+    """
+    Compiled evaluator for small batches (and until the native model is ready), native xgboost for batches of
+    min_rows or more. The native model is loaded by load_native(), or in a background thread started by
+    start_native_load() / the first large batch, so importing xgboost never delays startup or a request.
+    """
 
-def _get_model():
-    global _model
-    if _model is None:
-        if not os.path.exists(MODEL_PATH):
-            raise FileNotFoundError(f"Model not found at {MODEL_PATH}")
-        _model = xgb.XGBRegressor()
-        _model.load_model(MODEL_PATH)
-    return _model
+    def __init__(self, path: str, compiled: CompiledForest, min_rows: int = SCORE_NATIVE_MIN_ROWS):
+        self.path = path
+        self.compiled = compiled
+        self.min_rows = min_rows
+        self.native = None
+        self._lock = threading.Lock()
+        self._loading = False
 
+    def load_native(self):
+        """Load and warm the native model (no-op once loaded or after a failed attempt)."""
+        with self._lock:
+            if self.native is not None or self._loading:
+                return
+            self._loading = True
+        try:
+            started = time.perf_counter()
+            model = _load_native(self.path)
+            _warm_up(model)
+            self.native = model
+            metrics.MODEL_LOAD_SECONDS.set(time.perf_counter() - started, backend="xgboost")
+        except Exception:
+            # Stay on the compiled evaluator (e.g. libomp missing on Mac)
+            logger.exception("Native xgboost backend unavailable; large batches stay on the compiled evaluator")
 
-def predict_confidence(company_name: str, signal_text: str = "") -> float:
+    def start_native_load(self):
+        if self.native is None and not self._loading:
+            threading.Thread(target=self.load_native, name="native-model-load", daemon=True).start()
+
+    def backend_for(self, rows: int) -> str:
+        return "xgboost" if self.native is not None and rows >= self.min_rows else "compiled"
+
+    def predict(self, X):
+        if len(X) >= self.min_rows:
+            native = self.native
+            if native is not None:
+                return native.predict(X)
+            self.start_native_load()
+        return self.compiled.predict(X)
+
+
+def _load_model(path: str):
+    """Load the model with the configured backend. Both expose predict(X) on a (n, 10) array."""
+    started = time.perf_counter()
+    model = _load_with_backend(path)
+    metrics.MODEL_LOAD_SECONDS.set(time.perf_counter() - started, backend=_backend_name(model))
+    return model
+
+
+def _backend_name(model, rows: int = 1) -> str:
+    if isinstance(model, HybridModel):
+        return model.backend_for(rows)
+    return "compiled" if isinstance(model, CompiledForest) else "xgboost"
+
+
+def _load_native(path: str):
+    import xgboost as xgb
+
+    model = xgb.XGBRegressor()
+    model.load_model(path)
+    return model
+
+
+def _load_with_backend(path: str):
+    if SCORE_BACKEND == "xgboost":
+        return _load_native(path)
+    compiled = compile_model(path)
+    if SCORE_BACKEND == "auto" and _xgboost_installed():
+        return HybridModel(path, compiled)
+    return compiled
+
+
+def _xgboost_installed() -> bool:
+    import importlib.util
+
+    return importlib.util.find_spec("xgboost") is not None
+
+
+def _warm_up(model):
+    """Run one prediction so the first real request does not pay for lazy initialisation."""
+    model.predict(_build_feature_matrix([(0, 0, 0, 0)]))
+
+
+def _preferred_extensions() -> tuple:
     """
-    Predict lead confidence score (0-100) using XGBoost model.
-    Combines features from company name and signal text for richer representation.
+    Load format for the configured backend. Measured on xgboost_guest_model: native xgboost loads .ubj in
+    1.3 ms vs 7.4 ms for .json; the compiled backend compiles .json in 13.6 ms (C json parser) vs 28.2 ms
+    through the pure-Python UBJSON decoder. "auto" compiles at startup, so it prefers .json too.
     """
-    model = _get_model()
+    if SCORE_BACKEND == "xgboost":
+        return (".ubj", ".json")
+    return (".json", ".ubj")
+
+
+model_registry = ModelRegistry(
+    [MODEL_UBJ_PATH, MODEL_PATH], MODEL_DIR, loader=_load_model, warmup=_warm_up, poll_s=MODEL_POLL_S,
+    extensions=_preferred_extensions(),
+)
+
+
+def model_version():
+    """Version id (file name + checksum) of the model currently serving."""
+    return model_registry.active()[0]
+
+
+def load_native_backend(wait: bool = False):
+    """
+    With SCORE_BACKEND=auto, load the native model for large batches: in a background thread, or here with
+    wait=True (serve.py does that in the master so workers share it). No-op for the other backends.
+    """
+    model = model_registry.active()[1]
+    if not isinstance(model, HybridModel):
+        return
+    if wait:
+        model.load_native()
+    else:
+        model.start_native_load()
+
 
+def _combined_text(company_name: str, signal_text: str = "") -> str:
     # Combine company + signal for feature extraction (signal adds intent context)
-    combined = f"{company_name} {signal_text}".strip()
+    return f"{company_name or ''} {signal_text or ''}".strip()
 
-    feats = _extract_text_features(combined)
-    values = [feats[k] for k in BASE_FEATURES]
-    values.extend(DEFAULT_DATETIME)
 
-    X = pd.DataFrame([values], columns=FEATURE_COLS)
+def _feature_keys(pairs) -> list:
+    """Text feature tuples for company/signal pairs. With DEFAULT_DATETIME fixed, a key fully determines the model input."""
+    matrix = text_feature_matrix([_combined_text(company, signal) for company, signal in pairs])
+    return list(map(tuple, matrix.tolist()))
 
-    pred = model.predict(X)[0]
 
-    # Scale model output (trained on 0-9999 range) to 0-100 confidence
-    # Clip and normalize
-    raw_score = float(np.clip(pred, 0, 10000))
-    confidence = min(100, max(0, (raw_score / 10000) * 100))
+def _build_feature_matrix(keys) -> np.ndarray:
+    """Build the (n_rows, n_features) model input from feature keys in one pass."""
+    X = np.empty((len(keys), len(FEATURE_COLS)), dtype=np.float32)
+    X[:, :len(BASE_FEATURES)] = keys
+    X[:, len(BASE_FEATURES):] = DEFAULT_DATETIME
+    return X
 
-    return round(confidence, 1)
 
+def _to_confidence(preds: np.ndarray) -> np.ndarray:
+    """Scale raw model output (trained on 0-9999 range) to 0-100 confidence, rounded to 0.1."""
+    raw = np.clip(preds.astype(np.float64), 0, 10000)
+    return np.round(np.clip(raw / 10000 * 100, 0, 100), 1)
+
+
+def score_cache_stats() -> dict:
+    return _score_cache.stats()
+
+
+def _cache_metrics() -> dict:
+    stats = _score_cache.stats()
+    return {("hits",): stats["hits"], ("misses",): stats["misses"], ("size",): stats["size"], ("hit_ratio",): stats["hitRatio"]}
+
+
+metrics.REGISTRY.gauge("hp_score_cache", "Score cache hits, misses, size and hit ratio.", ("stat",), collect_fn=_cache_metrics)
+
+
+def predict_confidence_batch_with_version(pairs) -> tuple:
+    """
+    Predict confidence scores (0-100) for many (company_name, signal_text) pairs.
+    Cached feature vectors are served from the LRU cache; the rest go through a single
+    model.predict on one feature matrix. Output order matches input.
+    Returns (scores, model_version); every score comes from that one model version.
+    """
+    version, model = model_registry.active()
+    if not pairs:
+        return [], version
+    _score_cache.check_version(version)
+    metrics.SCORE_BATCH_SIZE.observe(len(pairs))
+
+    with metrics.FEATURE_SECONDS.time():
+        keys = _feature_keys(pairs)
+    scores = [_score_cache.get(k) for k in keys]
+
+    missing = list(dict.fromkeys(k for k, score in zip(keys, scores) if score is None))
+    if missing:
+        metrics.PREDICT_BATCH_SIZE.observe(len(missing))
+        with metrics.PREDICT_SECONDS.time(backend=_backend_name(model, len(missing))):
+            preds = model.predict(_build_feature_matrix(missing))
+        computed = dict(zip(missing, (float(c) for c in _to_confidence(preds))))
+        for k, score in computed.items():
+            _score_cache.put(k, score, version)
+        scores = [computed[k] if score is None else score for k, score in zip(keys, scores)]
+    return scores, version
+
+
+def predict_confidence_batch(pairs) -> list:
+    """Scores only; see predict_confidence_batch_with_version."""
+    return predict_confidence_batch_with_version(pairs)[0]
 
-def enrich_lead_with_score(lead: dict) -> dict:
-    """Add AI-predicted confidence score to a lead. Blends with static if present."""
-    company = lead.get("company", "")
-    signal = lead.get("signal", "")
-    ai_score = predict_confidence(company, signal)
 
+def score_pairs(pairs) -> list:
+    """Per-item {"confidence", "model_version"} results, for endpoints that report the serving version."""
+    scores, version = predict_confidence_batch_with_version(pairs)
+    return [{"confidence": score, "model_version": version} for score in scores]
+
+
+def predict_confidence(company_name: str, signal_text: str = "") -> float:
+    """
+    Predict lead confidence score (0-100) using XGBoost model.
+    Combines features from company name and signal text for richer representation.
+    """
+    return predict_confidence_batch([(company_name, signal_text)])[0]
+
+
+def _blend_score(lead: dict, ai_score: float) -> dict:
     # Blend: 70% AI model + 30% static (if provided) for demo variety
     static = lead.get("confidence")
     if static is not None:
@@ -86,3 +256,16 @@ def enrich_lead_with_score(lead: dict) -> dict:
         confidence = ai_score
 
     return {**lead, "confidence": min(100, max(0, confidence)), "ai_score": ai_score}
+
+
+def enrich_lead_with_score(lead: dict) -> dict:
+    """Add AI-predicted confidence score to a lead. Blends with static if present."""
+    company = lead.get("company", "")
+    signal = lead.get("signal", "")
+    return _blend_score(lead, predict_confidence(company, signal))
+
+
+def enrich_leads_with_scores(leads: list) -> list:
+    """Batch version of enrich_lead_with_score: one model.predict for the whole list."""
+    scores = predict_confidence_batch([(lead.get("company", ""), lead.get("signal", "")) for lead in leads])
+    return [_blend_score(lead, score) for lead, score in zip(leads, scores)]
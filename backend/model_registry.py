@@ -0,0 +1,240 @@
+"""
+Versioned model registry with zero-downtime hot reload.
+Model files are identified by name + content checksum. A background watcher detects new files
+(by mtime/size, confirmed by checksum), loads and warms them off the request path, then swaps the
+active (version, model) pair in a single assignment so requests never see a half-loaded model.
+A pinned version is stored in a file in the model directory and re-read on every scan, so all
+worker processes of a pre-fork server serve the same pin.
+"""
+
+import glob
+import hashlib
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Model file formats, in default preference order when one model is saved in several formats
+MODEL_EXTENSIONS = (".ubj", ".json")
+# Copies of one model written within this window (e.g. .json then .ubj by xgboost_model.py) count as one save
+SAME_SAVE_WINDOW_NS = 60 * 10**9
+# File in model_dir holding the pinned version, shared by every process serving from that directory
+PIN_FILE = "PINNED"
+
+
+def _checksum(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ModelRegistry:
+    """
+    paths: individual model files always considered (e.g. the legacy xgboost_guest_model.json)
+    model_dir: directory scanned for additional versioned model files
+    loader(path) -> model with predict(X); warmup(model) runs one prediction before the swap
+    extensions: format preference when a model exists in several formats (the fastest for the loader first)
+    """
+
+    def __init__(self, paths, model_dir, loader, warmup=None, poll_s: float = 10.0, extensions=MODEL_EXTENSIONS):
+        self.paths = [os.path.abspath(p) for p in paths]
+        self.extensions = tuple(extensions)
+        self.model_dir = os.path.abspath(model_dir)
+        self.loader = loader
+        self.warmup = warmup
+        self.poll_s = poll_s
+        self._active = None  # (version, model) - replaced atomically, never mutated
+        self.pin_path = os.path.join(self.model_dir, PIN_FILE)
+        self._pinned = None
+        self._versions = {}  # version -> info dict
+        self._checksums = {}  # path -> ((mtime_ns, size), checksum)
+        self._load_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---- discovery ----
+
+    def _candidate_paths(self) -> list:
+        """
+        Model files to consider. When one model exists in several formats, the newest copy wins; copies saved
+        together (within SAME_SAVE_WINDOW_NS) are the same model, and the preferred format is loaded.
+        """
+        found = [p for p in self.paths if os.path.exists(p)]
+        if os.path.isdir(self.model_dir):
+            for ext in MODEL_EXTENSIONS:
+                found.extend(glob.glob(os.path.join(self.model_dir, f"*{ext}")))
+        by_stem = {}
+        for path in sorted(set(found)):
+            stem, ext = os.path.splitext(path)
+            if ext not in self.extensions:
+                continue
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            by_stem.setdefault(stem, []).append((mtime, path, ext))
+        chosen = []
+        for copies in by_stem.values():
+            newest = max(mtime for mtime, _, _ in copies)
+            same_save = [c for c in copies if newest - c[0] <= SAME_SAVE_WINDOW_NS]
+            chosen.append(min(same_save, key=lambda c: self.extensions.index(c[2]))[1])
+        return sorted(chosen)
+
+    def _read_pin(self):
+        try:
+            with open(self.pin_path) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _write_pin(self, version) -> None:
+        if version is None:
+            try:
+                os.remove(self.pin_path)
+            except FileNotFoundError:
+                pass
+            return
+        os.makedirs(self.model_dir, exist_ok=True)
+        tmp = f"{self.pin_path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(version + "\n")
+        os.replace(tmp, self.pin_path)
+
+    def _clear_pin(self, version: str) -> None:
+        """Remove the pin file if it still pins `version` (another process may have pinned something else)."""
+        if self._read_pin() == version:
+            self._write_pin(None)
+
+    def scan(self) -> dict:
+        """
+        Refresh the version table and the pin (set by any process). Files are only re-hashed when their
+        mtime or size changes.
+        """
+        self._pinned = self._read_pin()
+        versions = {}
+        for path in self._candidate_paths():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            stamp = (st.st_mtime_ns, st.st_size)
+            cached = self._checksums.get(path)
+            if cached is None or cached[0] != stamp:
+                cached = (stamp, _checksum(path))
+                self._checksums[path] = cached
+            stem = os.path.splitext(os.path.basename(path))[0]
+            version = f"{stem}-{cached[1][:8]}"
+            versions[version] = {"version": version, "path": path, "mtime": st.st_mtime, "size": st.st_size}
+            previous = self._versions.get(version)
+            if previous is not None and "load_seconds" in previous:
+                versions[version]["load_seconds"] = previous["load_seconds"]
+        self._versions = versions
+        if self._pinned is not None and self._pinned not in versions:
+            logger.warning("Pinned model version %s no longer exists; unpinning", self._pinned)
+            self._clear_pin(self._pinned)
+            self._pinned = None
+        return versions
+
+    def _target_version(self):
+        if self._pinned in self._versions:
+            return self._pinned
+        if not self._versions:
+            return None
+        return max(self._versions.values(), key=lambda v: (v["mtime"], v["version"]))["version"]
+
+    # ---- loading ----
+
+    def _load(self, version: str):
+        info = self._versions[version]
+        started = time.perf_counter()
+        model = self.loader(info["path"])
+        if self.warmup is not None:
+            self.warmup(model)
+        info["load_seconds"] = round(time.perf_counter() - started, 4)
+        return model
+
+    def refresh(self) -> bool:
+        """Scan and, if the target version changed, load + warm it and swap it in. Returns True on swap."""
+        with self._load_lock:
+            self.scan()
+            target = self._target_version()
+            if target is None:
+                if self._active is None:
+                    raise FileNotFoundError(f"No model files found in {self.paths} or {self.model_dir}")
+                return False
+            if self._active is not None and self._active[0] == target:
+                return False
+            model = self._load(target)
+            previous = self._active[0] if self._active else None
+            self._active = (target, model)
+            logger.info("Model swapped: %s -> %s", previous, target)
+            return True
+
+    def active(self):
+        """Current (version, model). Loads synchronously only if nothing has been loaded yet."""
+        current = self._active
+        if current is None:
+            self.refresh()
+            current = self._active
+        return current
+
+    @property
+    def active_version(self):
+        return self._active[0] if self._active else None
+
+    # ---- admin ----
+
+    def pin(self, version: str):
+        """
+        Serve a specific version (loaded and warmed before it takes over). Other processes sharing the
+        model directory switch on their next watcher poll.
+        """
+        with self._load_lock:
+            self.scan()
+            if version not in self._versions:
+                raise KeyError(version)
+            self._write_pin(version)
+        self.refresh()
+
+    def unpin(self):
+        with self._load_lock:
+            self._write_pin(None)
+        self.refresh()
+
+    def list_versions(self) -> dict:
+        # Under the load lock so this scan cannot interleave with the watcher's refresh()
+        with self._load_lock:
+            self.scan()
+            active = self.active_version
+            return {
+                "active": active,
+                "pinned": self._pinned,
+                "versions": [
+                    {**info, "active": v == active, "pinned": v == self._pinned}
+                    for v, info in sorted(self._versions.items(), key=lambda kv: kv[1]["mtime"], reverse=True)
+                ],
+            }
+
+    # ---- background watcher ----
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="model-registry", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_s):
+            try:
+                self.refresh()
+            except Exception:
+                # Keep serving the current model if a new file is unreadable or half-written
+                logger.exception("Model refresh failed; keeping %s", self.active_version)
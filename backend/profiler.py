@@ -0,0 +1,56 @@
+"""
+Opt-in sampling profiler.
+Periodically snapshots every thread's Python stack and aggregates them in the "folded" format
+(frame;frame;frame count) that flamegraph.pl / speedscope / inferno read directly.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+PROFILER_ENABLED = os.environ.get("PROFILER_ENABLED", "0") == "1"
+MAX_PROFILE_SECONDS = 60.0
+
+_profile_lock = threading.Lock()
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def sample_stacks(seconds: float = 5.0, interval_ms: float = 5.0, include_idle: bool = False) -> str:
+    """
+    Sample all threads (except the sampler) for `seconds` and return folded stacks, hottest first.
+    Idle threads (waiting in select/lock/sleep) are skipped unless include_idle is set.
+    """
+    seconds = max(0.1, min(float(seconds), MAX_PROFILE_SECONDS))
+    interval = max(0.001, float(interval_ms) / 1000)
+    if not _profile_lock.acquire(blocking=False):
+        raise RuntimeError("A profile is already running")
+    try:
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        stacks = Counter()
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                frames = []
+                while frame is not None:
+                    frames.append(_frame_label(frame))
+                    frame = frame.f_back
+                if not frames:
+                    continue
+                leaf = frames[0]
+                if not include_idle and leaf.startswith(("wait ", "select ", "_worker ", "sleep ", "run_forever ")):
+                    continue
+                frames.append(names.get(ident, f"thread-{ident}"))
+                stacks[";".join(reversed(frames))] += 1
+            time.sleep(interval)
+    finally:
+        _profile_lock.release()
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
@@ -0,0 +1,82 @@
+"""
+Micro-batching inference scheduler.
+Collects concurrent /api/score requests into one batch (bounded by size and wait time),
+runs a single predict per batch off the event loop and resolves each caller's future.
+"""
+
+import asyncio
+import os
+
+# Limits (overridable via environment)
+MAX_BATCH_SIZE = int(os.environ.get("SCORE_MAX_BATCH_SIZE", "64"))
+MAX_WAIT_MS = float(os.environ.get("SCORE_MAX_WAIT_MS", "5"))
+
+
+class InferenceScheduler:
+    """
+    Batches (company_name, signal_text) pairs for a batch predict function
+    (predict_fn(pairs) -> one result per pair, in order).
+    All bookkeeping runs on the event loop thread; only predict_fn runs in the threadpool.
+    """
+
+    def __init__(self, predict_fn, max_batch_size: int = MAX_BATCH_SIZE, max_wait_ms: float = MAX_WAIT_MS):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000
+        self._pending = []  # [(pair, future)]
+        self._timer = None
+        self._in_flight = 0
+        self._batches = 0
+        self._items = 0
+        self._largest_batch = 0
+
+    async def submit(self, company_name: str, signal_text: str = ""):
+        """Queue one pair and wait for its result."""
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append(((company_name, signal_text), fut))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await fut
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        # submit() flushes as soon as max_batch_size is reached, so pending never exceeds it
+        batch, self._pending = self._pending, []
+        asyncio.get_running_loop().create_task(self._run(batch))
+
+    async def _run(self, batch):
+        self._in_flight += len(batch)
+        self._batches += 1
+        self._items += len(batch)
+        self._largest_batch = max(self._largest_batch, len(batch))
+        try:
+            results = await asyncio.to_thread(self.predict_fn, [pair for pair, _ in batch])
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+        else:
+            for (_, fut), result in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(result)
+        finally:
+            self._in_flight -= len(batch)
+
+    def stats(self) -> dict:
+        return {
+            "queueDepth": len(self._pending),
+            "inFlight": self._in_flight,
+            "batches": self._batches,
+            "items": self._items,
+            "avgBatchSize": round(self._items / self._batches, 2) if self._batches else 0,
+            "maxBatchSizeSeen": self._largest_batch,
+            "maxBatchSize": self.max_batch_size,
+            "maxWaitMs": self.max_wait * 1000,
+        }
@@ -0,0 +1,66 @@
+"""
+Bounded LRU cache for model scores, keyed on the extracted feature tuple.
+Entries are tagged with the model version they were computed under and dropped when it changes.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+CACHE_SIZE = int(os.environ.get("SCORE_CACHE_SIZE", "10000"))
+
+
+class ScoreCache:
+    """Thread-safe LRU map of feature tuple -> confidence, with hit/miss counters."""
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = max(0, int(maxsize))
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+
+    def check_version(self, version):
+        """Clear all entries if the model version differs from the one they were computed with."""
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._data.clear()
+                    self._version = version
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, version=None):
+        """Store a value; if version is given, drop it when the cache has since moved to another version."""
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            if version is not None and version != self._version:
+                return
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxSize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRatio": round(self.hits / total, 4) if total else 0.0,
+        }
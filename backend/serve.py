@@ -0,0 +1,100 @@
+"""
+Production serving mode: pre-fork multi-process server (gunicorn master + uvicorn workers).
+The app is imported and the model loaded + warmed once in the master before forking, so every
+worker shares the model memory copy-on-write instead of holding its own copy.
+
+    python serve.py                      # WEB_CONCURRENCY workers (default: CPU count)
+    WEB_CONCURRENCY=8 BIND=0.0.0.0:8000 python serve.py
+
+Graceful restarts: `kill -HUP <master pid>` replaces workers one by one after they finish
+in-flight requests; MAX_REQUESTS recycles workers periodically.
+
+With SCORE_BACKEND=auto the native xgboost model for large batches is loaded in the master as well.
+Shared across workers: the lead views and lead store ingest (built once in the master), the
+pinned model version (a file in MODEL_DIR) and /metrics (aggregated through METRICS_DIR).
+Per worker: a model hot-reloaded later by the registry (loaded per worker, not shared, until the
+next restart) and the /api/score/stats and /api/score/cache JSON, which report the worker that
+answered (its pid is the `worker` field).
+"""
+
+import gc
+import glob
+import multiprocessing
+import os
+import tempfile
+
+from gunicorn.app.base import BaseApplication
+
+WORKERS = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+BIND = os.environ.get("BIND", "0.0.0.0:8000")
+# Recycle each worker after this many requests (+ jitter); 0 disables
+MAX_REQUESTS = int(os.environ.get("MAX_REQUESTS", "0"))
+# Seconds a worker gets to finish in-flight requests on restart/shutdown
+GRACEFUL_TIMEOUT = int(os.environ.get("GRACEFUL_TIMEOUT", "30"))
+
+
+def _worker_class() -> str:
+    try:
+        import uvicorn_worker  # noqa: F401  (maintained home of the worker class)
+        return "uvicorn_worker.UvicornWorker"
+    except ImportError:
+        return "uvicorn.workers.UvicornWorker"
+
+
+def _metrics_dir() -> str:
+    """Snapshot directory the workers aggregate /metrics through, emptied of a previous run's pids."""
+    path = os.environ.get("METRICS_DIR") or tempfile.mkdtemp(prefix="hp-sentinel-metrics-")
+    os.makedirs(path, exist_ok=True)
+    for stale in glob.glob(os.path.join(path, "*.json")):
+        os.remove(stale)
+    return path
+
+
+def preload_app():
+    """Import the app, load + warm the model and build the lead views once, in the master process."""
+    # Read by metrics.py at import, so it must be set before the app is imported
+    os.environ["METRICS_DIR"] = _metrics_dir()
+    import main
+    from ml_model import load_native_backend, model_registry
+
+    if model_registry is not None:
+        model_registry.active()
+        load_native_backend(wait=True)
+    main.build_views()
+    # Move everything allocated so far into the permanent generation: worker GCs then never
+    # write to these objects' headers, so their pages stay shared instead of being copied.
+    gc.collect()
+    gc.freeze()
+    return main.app
+
+
+class SentinelServer(BaseApplication):
+    def __init__(self, app, options: dict):
+        self.application = app
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        return self.application
+
+
+def run():
+    options = {
+        "bind": BIND,
+        "workers": max(1, WORKERS),
+        "worker_class": _worker_class(),
+        "preload_app": True,
+        "graceful_timeout": GRACEFUL_TIMEOUT,
+        "timeout": max(GRACEFUL_TIMEOUT, 60),
+        "max_requests": MAX_REQUESTS,
+        "max_requests_jitter": MAX_REQUESTS // 10 if MAX_REQUESTS else 0,
+    }
+    SentinelServer(preload_app(), options).run()
+
+
+if __name__ == "__main__":
+    run()
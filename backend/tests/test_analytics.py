@@ -0,0 +1,76 @@
+"""Incremental apply/remove in LeadAnalytics matches a from-scratch aggregation."""
+
+from datetime import date, timedelta
+
+from analytics import LeadAnalytics
+
+TODAY = date(2026, 10, 14)  # a Wednesday
+
+
+def _lead(lead_id, status="Detected", industry="Power", products=("HSD",), confidence=80, days_ago=0):
+    return {
+        "id": lead_id, "status": status, "industry": industry, "products": list(products),
+        "confidence": confidence, "detectedAt": (TODAY - timedelta(days=days_ago)).isoformat(),
+    }
+
+
+def _snapshot(analytics):
+    return (
+        analytics.kpis(), analytics.leads_over_time(), analytics.product_demand(),
+        analytics.lead_status(), analytics.funnel(), analytics.sectors(),
+    )
+
+
+def _fresh(leads):
+    analytics = LeadAnalytics(now_fn=lambda: TODAY)
+    analytics.apply(leads)
+    return analytics
+
+
+def test_updates_and_removals_match_a_rebuild():
+    leads = {
+        1: _lead(1, "Converted", "Power", ("Furnace Oil (~40 KL/month)", "HSD"), 95),
+        2: _lead(2, "Contacted", "Shipping", ("HSD", "FO"), 88, days_ago=8),
+        3: _lead(3, "Verified", "Infrastructure", ("Bitumen",), 70, days_ago=15),
+        4: _lead(4, "Detected", "Power", ("LPG",), 91, days_ago=2),
+    }
+    analytics = _fresh(list(leads.values()))
+
+    leads[2] = _lead(2, "Converted", "Shipping", ("HSD",), 93, days_ago=8)  # status, products, confidence change
+    leads[5] = _lead(5, "Detected", "Petrochemicals", ("Hexane",), 60)
+    analytics.apply([leads[2], leads[5]])
+    del leads[3]
+    analytics.apply([], removed_ids=[3])
+    analytics.apply([leads[1]])  # unchanged re-score is a no-op
+
+    assert analytics.count() == 4
+    assert _snapshot(analytics) == _snapshot(_fresh(list(leads.values())))
+
+
+def test_counters_and_averages():
+    analytics = _fresh([
+        _lead(1, "Converted", "Power", ("HSD",), 90),
+        _lead(2, "Contacted", "Power", ("HSD", "FO"), 80, days_ago=7),
+        _lead(3, "Detected", "Shipping", ("FO",), 70, days_ago=70),
+    ])
+    assert analytics.kpis() == {"warmEntitiesThisWeek": 1, "highConfidenceLeads": 1, "conversionRate": 50.0, "avgConfidence": 80.0}
+    assert analytics.sectors() == [{"name": "Power", "count": 2, "avgConfidence": 85.0}, {"name": "Shipping", "count": 1, "avgConfidence": 70.0}]
+    demand = {p["name"]: p for p in analytics.product_demand()}
+    assert demand["HSD"] == {"name": "HSD", "value": 50, "avgConfidence": 85.0}
+    assert demand["FO"]["avgConfidence"] == 75.0
+    assert [s["count"] for s in analytics.funnel()] == [3, 2, 2, 1]
+    weeks = analytics.leads_over_time()
+    assert [w["detected"] for w in weeks] == [0, 0, 0, 1, 1]  # lead 3 is outside the window
+    assert [w["certified"] for w in weeks] == [0, 0, 0, 1, 1]
+
+    analytics.apply([], removed_ids=[1, 2, 3])
+    assert analytics.kpis()["avgConfidence"] == 0.0
+    assert analytics.sectors() == []
+    assert all(p["value"] == 0 and p["avgConfidence"] == 0.0 for p in analytics.product_demand())
+
+
+def test_undated_leads_use_first_seen():
+    seen = {7: TODAY - timedelta(days=14)}
+    analytics = LeadAnalytics(now_fn=lambda: TODAY, first_seen_fn=lambda ids: {i: seen[i] for i in ids if i in seen})
+    analytics.apply([{"id": 7, "status": "Detected"}, {"id": 8, "status": "Detected"}])
+    assert [w["detected"] for w in analytics.leads_over_time()] == [0, 0, 1, 0, 1]
@@ -0,0 +1,86 @@
+"""The streaming CSV/NDJSON parsers agree with the csv module and stay linear on malformed input."""
+
+import asyncio
+import csv
+import io
+import time
+
+from bulk_scoring import iter_csv_records, iter_lines, iter_ndjson_records
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def _parse_csv(data: bytes, chunk_size: int = 7, max_chars: int = 1 << 20) -> list:
+    async def run():
+        lines = iter_lines(_chunks(data, chunk_size), max_chars)
+        return [r async for r in iter_csv_records(lines, max_chars)]
+
+    return asyncio.run(run())
+
+
+def _expected(text: str) -> list:
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+def test_quoted_fields_spanning_lines():
+    text = 'company_name,signal_text\r\n"Acme\nPower","line one\r\nline ""two""\n\nend"\nPlain Co,x\n'
+    assert _parse_csv(text.encode()) == _expected(text.replace("\r\n", "\n"))
+
+
+def test_stray_quotes_are_literals():
+    text = 'company_name,signal_text\nAcme "Ltd,x\nBeta,say "hi"\n"Gamma"x"y,z\nDelta,ok\n'
+    records = _parse_csv(text.encode())
+    assert records == _expected(text)
+    assert [r["company_name"] for r in records] == ['Acme "Ltd', "Beta", 'Gammax"y', "Delta"]
+
+
+def test_chunk_boundaries_do_not_change_records():
+    text = 'company_name,signal_text\n"Zoë\nGmbH","multi\nline ""q"""\nÅngström Ltd,"a,b"\nlast,no newline'
+    expected = _expected(text)
+    for size in range(1, len(text.encode()) + 1):
+        assert _parse_csv(text.encode(), chunk_size=size) == expected, size
+
+
+def test_stray_quote_does_not_buffer_the_rest_of_the_upload():
+    rows = 20_000
+    data = ("company_name,signal_text\nAcme \"Ltd,x\n" + "".join(f"Co {i},sig\n" for i in range(rows))).encode()
+    started = time.perf_counter()
+    records = _parse_csv(data, chunk_size=64 << 10)
+    assert len(records) == rows + 1
+    assert all("error" not in r for r in records)
+    assert time.perf_counter() - started < 5
+
+
+def test_overlong_records_become_errors_and_parsing_resumes():
+    data = ('company_name,signal_text\n"' + "x" * 500 + '\nnext,1\n' + "y" * 500 + "\nlast,2\n").encode()
+    records = _parse_csv(data, max_chars=100)
+    assert records == [
+        {"error": "Record exceeds 100 characters"},
+        {"company_name": "next", "signal_text": "1"},
+        {"error": "Record exceeds 100 characters"},
+        {"company_name": "last", "signal_text": "2"},
+    ]
+
+
+def test_unterminated_quote_at_end_is_reported():
+    assert _parse_csv(b'company_name,signal_text\nok,1\n"open,2\n') == [
+        {"company_name": "ok", "signal_text": "1"},
+        {"error": "Unterminated quoted field at end of upload"},
+    ]
+
+
+def test_ndjson_overlong_and_malformed_lines():
+    data = b'{"company_name": "a"}\n' + b'{"x": "' + b"z" * 200 + b'"}\n[1]\n{bad\n'
+
+    async def run():
+        lines = iter_lines(_chunks(data, 16), 100)
+        return [r async for r in iter_ndjson_records(lines, 100)]
+
+    records = asyncio.run(run())
+    assert records[0] == {"company_name": "a"}
+    assert records[1] == {"error": "Record exceeds 100 characters"}
+    assert records[2] == {"error": "Expected a JSON object per line"}
+    assert records[3]["error"].startswith("Invalid JSON")
@@ -0,0 +1,60 @@
+"""Cursor pagination and reconciliation in the SQLite lead store."""
+
+import pytest
+
+from lead_store import LeadStore, SORT_FIELDS
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = LeadStore(str(tmp_path / "leads.db"))
+    s.upsert_many([
+        {
+            "id": i,
+            "industry": ["Power", "Infrastructure", "Shipping"][i % 3],
+            "depot": None if i % 4 == 0 else f"Depot {i % 3}",  # NULL sort values mid-table
+            "confidence": float(50 + (i * 7) % 40),
+            "ai_score": float(i % 5),
+            "gstin": f"G{i}",
+        }
+        for i in range(1, 24)
+    ])
+    return s
+
+
+def _all_pages(store, limit, **kwargs):
+    ids, cursor, pages = [], None, 0
+    while True:
+        leads, cursor = store.query(cursor=cursor, limit=limit, **kwargs)
+        ids.extend(lead["id"] for lead in leads)
+        pages += 1
+        if cursor is None:
+            return ids, pages
+
+
+@pytest.mark.parametrize("sort", SORT_FIELDS)
+@pytest.mark.parametrize("order", ["asc", "desc"])
+@pytest.mark.parametrize("limit", [1, 4, 7])
+def test_pages_cover_the_full_ordering(store, sort, order, limit):
+    full, _ = store.query(sort=sort, order=order, limit=1000)
+    ids, pages = _all_pages(store, limit, sort=sort, order=order)
+    assert ids == [lead["id"] for lead in full]
+    assert len(ids) == 23
+    assert pages == -(-23 // limit)
+
+
+def test_filters_apply_across_pages(store):
+    ids, _ = _all_pages(store, 2, industry="Power", min_confidence=60, sort="confidence", order="desc")
+    full, _ = store.query(industry="Power", min_confidence=60, sort="confidence", order="desc", limit=1000)
+    assert ids == [lead["id"] for lead in full]
+    assert all(lead["industry"] == "Power" and lead["confidence"] >= 60 for lead in full)
+
+
+def test_invalid_cursor_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.query(cursor="not-a-cursor")
+
+
+def test_retain_drops_leads_missing_from_the_source(store):
+    assert store.retain([1, 2, 3]) == 20
+    assert [lead["id"] for lead in store.query(limit=1000)[0]] == [1, 2, 3]
@@ -0,0 +1,52 @@
+"""Multi-process /metrics: counters and histograms summed over workers, gauges per live worker."""
+
+import json
+import os
+
+import metrics
+
+
+def _registry(shared_dir):
+    registry = metrics.Registry(shared_dir=shared_dir)
+    requests = registry.counter("requests_total", "Requests.", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    depth = registry.gauge("queue_depth", "Queue depth.")
+    return registry, requests, latency, depth
+
+
+def test_render_aggregates_worker_snapshots(tmp_path):
+    # Another (live) worker, here the parent process, and a worker that has since exited
+    other, requests, latency, depth = _registry(str(tmp_path))
+    requests.inc(3, route="/a")
+    latency.observe(0.05)
+    depth.set(7)
+    snapshot = other._snapshot([requests, latency, depth])
+    (tmp_path / f"{os.getppid()}.json").write_text(json.dumps(snapshot))
+    dead_pid = 2**22 + 1
+    (tmp_path / f"{dead_pid}.json").write_text(json.dumps(snapshot))
+
+    registry, requests, latency, depth = _registry(str(tmp_path))
+    requests.inc(route="/a")
+    requests.inc(route="/b")
+    latency.observe(0.5)
+    depth.set(2)
+    lines = set(registry.render().splitlines())
+
+    assert 'requests_total{route="/a"} 7' in lines  # 1 here + 3 live + 3 from the exited worker
+    assert 'requests_total{route="/b"} 1' in lines
+    assert 'latency_seconds_bucket{le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 3' in lines
+    assert "latency_seconds_count 3" in lines
+    assert f'queue_depth{{worker="{os.getpid()}"}} 2' in lines
+    assert f'queue_depth{{worker="{os.getppid()}"}} 7' in lines
+    assert not any(f'worker="{dead_pid}"' in line for line in lines)
+
+
+def test_without_shared_dir_renders_this_process_only():
+    registry, requests, _, depth = _registry(None)
+    requests.inc(route="/a")
+    depth.set(1)
+    lines = registry.render().splitlines()
+    assert 'requests_total{route="/a"} 1' in lines
+    assert "queue_depth 1" in lines
+    assert not any("worker=" in line for line in lines)
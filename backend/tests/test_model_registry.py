@@ -0,0 +1,47 @@
+"""The pinned model version is shared by every registry (process) serving from one model directory."""
+
+import os
+
+from model_registry import ModelRegistry
+
+
+def _write_model(path, content, mtime):
+    with open(path, "w") as f:
+        f.write(content)
+    os.utime(path, (mtime, mtime))
+
+
+def _registry(model_dir):
+    return ModelRegistry([], model_dir, loader=lambda path: os.path.basename(path), poll_s=3600)
+
+
+def test_pin_is_seen_by_other_processes(tmp_path):
+    _write_model(tmp_path / "old.json", "{}", 1_000_000)
+    _write_model(tmp_path / "new.json", "[]", 2_000_000)
+    worker_a, worker_b = _registry(str(tmp_path)), _registry(str(tmp_path))
+    assert worker_a.active()[1] == worker_b.active()[1] == "new.json"
+
+    old = next(v for v, info in worker_a.scan().items() if info["path"].endswith("old.json"))
+    worker_a.pin(old)
+    assert worker_a.active()[1] == "old.json"
+    assert worker_b.refresh() and worker_b.active()[1] == "old.json"
+    assert worker_b.list_versions()["pinned"] == old
+
+    worker_b.unpin()
+    assert worker_a.refresh() and worker_a.active()[1] == "new.json"
+    assert worker_a.list_versions()["pinned"] is None
+
+
+def test_pin_is_cleared_when_its_model_file_disappears(tmp_path):
+    _write_model(tmp_path / "old.json", "{}", 1_000_000)
+    _write_model(tmp_path / "new.json", "[]", 2_000_000)
+    registry = _registry(str(tmp_path))
+    old = next(v for v, info in registry.scan().items() if info["path"].endswith("old.json"))
+    registry.pin(old)
+    assert registry.active()[1] == "old.json"
+
+    os.remove(tmp_path / "old.json")
+    assert registry.refresh() and registry.active()[1] == "new.json"
+    listing = registry.list_versions()
+    assert listing["pinned"] is None and not any(v["pinned"] for v in listing["versions"])
+    assert not (tmp_path / "PINNED").exists()
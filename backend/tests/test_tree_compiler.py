@@ -0,0 +1,73 @@
+"""Compiled NumPy evaluator vs native xgboost, for JSON and UBJSON model files."""
+
+import os
+
+import numpy as np
+import pytest
+
+from tree_compiler import compile_model
+
+xgb = pytest.importorskip("xgboost")
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SHIPPED_MODELS = [os.path.join(REPO_ROOT, "xgboost_guest_model.json"), os.path.join(REPO_ROOT, "xgboost_guest_model.ubj")]
+
+
+def _inputs(forest, n=2000, nan_fraction=0.2, seed=0):
+    """Random rows over each feature's split range, exact split thresholds, and NaNs (missing -> default_left)."""
+    rng = np.random.default_rng(seed)
+    X = np.empty((n, forest.num_feature), dtype=np.float32)
+    is_split = forest.left != np.arange(len(forest.left))
+    for f in range(forest.num_feature):
+        thresholds = forest.threshold[is_split & (forest.feature == f)]
+        lo, hi = (thresholds.min(), thresholds.max()) if len(thresholds) else (0.0, 1.0)
+        span = max(hi - lo, 1.0)
+        X[:, f] = rng.uniform(lo - 0.1 * span, hi + 0.1 * span, n)
+        if len(thresholds):
+            exact = rng.random(n) < 0.1
+            X[exact, f] = rng.choice(thresholds, exact.sum())
+    X[rng.random(X.shape) < nan_fraction] = np.nan
+    return X
+
+
+def _assert_matches(path):
+    forest = compile_model(path)
+    native = xgb.XGBRegressor()
+    native.load_model(path)
+    X = _inputs(forest)
+    expected = native.predict(X)
+    # float32 sums in a different order: relative tolerance, plus an absolute one for outputs near zero
+    np.testing.assert_allclose(forest.predict(X), expected, rtol=1e-5, atol=1e-6 * np.abs(expected).max())
+
+
+@pytest.mark.parametrize("path", SHIPPED_MODELS, ids=os.path.basename)
+def test_shipped_model_matches_xgboost(path):
+    if not os.path.exists(path):
+        pytest.skip(f"{path} not present")
+    _assert_matches(path)
+
+
+@pytest.fixture(scope="module")
+def trained_with_missing(tmp_path_factory):
+    """A small model trained on data with NaNs, so default_left differs between nodes."""
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(500, 10)).astype(np.float32)
+    y = X[:, 0] * 3 + np.where(np.isnan(X[:, 1]), 5.0, X[:, 1]) + rng.normal(scale=0.1, size=500)
+    X[rng.random(X.shape) < 0.3] = np.nan
+    model = xgb.XGBRegressor(n_estimators=30, max_depth=5, tree_method="hist", random_state=0)
+    model.fit(X, y)
+    base = tmp_path_factory.mktemp("model") / "trained"
+    model.save_model(f"{base}.json")
+    model.save_model(f"{base}.ubj")
+    return base
+
+
+@pytest.mark.parametrize("ext", [".json", ".ubj"])
+def test_trained_model_with_missing_values_matches_xgboost(trained_with_missing, ext):
+    _assert_matches(f"{trained_with_missing}{ext}")
+
+
+def test_json_and_ubj_compile_to_the_same_forest(trained_with_missing):
+    a, b = compile_model(f"{trained_with_missing}.json"), compile_model(f"{trained_with_missing}.ubj")
+    X = _inputs(a)
+    np.testing.assert_array_equal(a.predict(X), b.predict(X))
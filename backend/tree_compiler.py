@@ -0,0 +1,217 @@
+"""
+Compiles a saved XGBoost model (JSON or UBJSON) into flat NumPy arrays and evaluates it without the xgboost library.
+All trees are laid out in one node array; leaves point at themselves so every row can walk
+every tree for exactly max_depth steps with vectorized gathers.
+"""
+
+import json
+import numpy as np
+
+# Objectives whose prediction is the raw margin (no link function)
+IDENTITY_OBJECTIVES = {"reg:squarederror", "reg:squaredlogerror", "reg:absoluteerror", "reg:pseudohubererror"}
+
+
+# UBJSON scalar markers -> big-endian NumPy dtype
+_UBJ_NUMERIC = {
+    b"i": ">i1", b"U": ">u1", b"I": ">i2", b"l": ">i4", b"L": ">i8", b"d": ">f4", b"D": ">f8",
+}
+
+
+class _UBJReader:
+    """Minimal UBJSON decoder for XGBoost's .ubj model files; typed arrays decode straight into NumPy."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    def _take(self, n: int) -> bytes:
+        chunk = self.data[self.pos:self.pos + n]
+        if len(chunk) != n:
+            raise ValueError("Truncated UBJSON data")
+        self.pos += n
+        return chunk
+
+    def _marker(self) -> bytes:
+        marker = self._take(1)
+        while marker == b"N":  # no-op
+            marker = self._take(1)
+        return marker
+
+    def _number(self, marker: bytes):
+        dtype = np.dtype(_UBJ_NUMERIC[marker])
+        value = np.frombuffer(self._take(dtype.itemsize), dtype=dtype)[0]
+        return float(value) if dtype.kind == "f" else int(value)
+
+    def _length(self) -> int:
+        return self._number(self._marker())
+
+    def _string(self) -> str:
+        return self._take(self._length()).decode("utf-8")
+
+    def value(self, marker: bytes = None):
+        marker = marker or self._marker()
+        if marker in _UBJ_NUMERIC:
+            return self._number(marker)
+        if marker == b"S" or marker == b"H":
+            return self._string()
+        if marker == b"C":
+            return self._take(1).decode("utf-8")
+        if marker == b"T":
+            return True
+        if marker == b"F":
+            return False
+        if marker == b"Z":
+            return None
+        if marker == b"[":
+            return self._array()
+        if marker == b"{":
+            return self._object()
+        raise ValueError(f"Unsupported UBJSON marker {marker!r}")
+
+    def _container_header(self):
+        elem_type, count = None, None
+        marker = self._marker()
+        if marker == b"$":
+            elem_type = self._take(1)
+            marker = self._marker()
+        if marker == b"#":
+            count = self._length()
+            marker = None
+        return elem_type, count, marker
+
+    def _array(self):
+        elem_type, count, marker = self._container_header()
+        if elem_type in _UBJ_NUMERIC and count is not None:
+            dtype = np.dtype(_UBJ_NUMERIC[elem_type])
+            return np.frombuffer(self._take(dtype.itemsize * count), dtype=dtype).astype(dtype.newbyteorder("="))
+        items = []
+        if count is not None:
+            for _ in range(count):
+                items.append(self.value(elem_type))
+            return items
+        while marker != b"]":
+            items.append(self.value(marker))
+            marker = self._marker()
+        return items
+
+    def _object(self):
+        elem_type, count, marker = self._container_header()
+        obj = {}
+        if count is not None:
+            for _ in range(count):
+                key = self._string()
+                obj[key] = self.value(elem_type)
+            return obj
+        while marker != b"}":
+            key = self._take(self._number(marker)).decode("utf-8")
+            obj[key] = self.value()
+            marker = self._marker()
+        return obj
+
+
+def load_model_document(path: str) -> dict:
+    """Parse a saved XGBoost model; .ubj files are read as UBJSON, anything else as JSON."""
+    if path.endswith(".ubj"):
+        with open(path, "rb") as f:
+            return _UBJReader(f.read()).value()
+    with open(path) as f:
+        return json.load(f)
+
+
+def _parse_base_score(value) -> float:
+    # XGBoost >= 3 stores base_score as a vector string, e.g. "[4.83735E3]"
+    return float(str(value).strip("[]"))
+
+
+class CompiledForest:
+    """Array-backed tree ensemble. predict(X) matches XGBRegressor.predict within float tolerance."""
+
+    def __init__(self, feature, threshold, left, right, default_left, value, roots, max_depth, base_score, num_feature):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.base_score = float(base_score)
+        self.num_feature = int(num_feature)
+
+    @classmethod
+    def from_file(cls, path: str) -> "CompiledForest":
+        learner = load_model_document(path)["learner"]
+        objective = learner["objective"]["name"]
+        if objective not in IDENTITY_OBJECTIVES:
+            raise ValueError(f"Unsupported objective for compiled model: {objective}")
+        booster = learner["gradient_booster"]
+        if booster["name"] != "gbtree":
+            raise ValueError(f"Unsupported booster for compiled model: {booster['name']}")
+
+        trees = booster["model"]["trees"]
+        feature, threshold, left, right, default_left, value, roots = [], [], [], [], [], [], []
+        max_depth = 0
+        offset = 0
+        for tree in trees:
+            if any(tree.get("split_type", [])):
+                raise ValueError("Categorical splits are not supported by the compiled model")
+            lc = np.asarray(tree["left_children"], dtype=np.int32)
+            rc = np.asarray(tree["right_children"], dtype=np.int32)
+            cond = np.asarray(tree["split_conditions"], dtype=np.float32)
+            is_leaf = lc == -1
+            idx = np.arange(len(lc), dtype=np.int32)
+
+            feature.append(np.where(is_leaf, 0, tree["split_indices"]).astype(np.int32))
+            threshold.append(np.where(is_leaf, np.float32(0), cond))
+            left.append(np.where(is_leaf, idx, lc) + offset)
+            right.append(np.where(is_leaf, idx, rc) + offset)
+            default_left.append(np.asarray(tree["default_left"], dtype=bool))
+            value.append(np.where(is_leaf, cond, np.float32(0)))
+            roots.append(offset)
+            max_depth = max(max_depth, _tree_depth(lc, rc))
+            offset += len(lc)
+
+        return cls(
+            feature=np.concatenate(feature),
+            threshold=np.concatenate(threshold),
+            left=np.concatenate(left).astype(np.int32),
+            right=np.concatenate(right).astype(np.int32),
+            default_left=np.concatenate(default_left),
+            value=np.concatenate(value),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth,
+            base_score=_parse_base_score(learner["learner_model_param"]["base_score"]),
+            num_feature=int(learner["learner_model_param"]["num_feature"]),
+        )
+
+    def predict(self, X) -> np.ndarray:
+        """Evaluate all trees for a batch of rows. X: (n_rows, num_feature); NaN follows default_left."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.num_feature:
+            raise ValueError(f"Expected input of shape (n, {self.num_feature}), got {X.shape}")
+        n = X.shape[0]
+        flat = X.ravel()
+        row_offset = (np.arange(n, dtype=np.int64) * self.num_feature)[:, None]
+        node = np.repeat(self.roots[None, :], n, axis=0)  # (n_rows, n_trees)
+        for _ in range(self.max_depth):
+            x = flat.take(row_offset + self.feature.take(node))
+            go_left = x < self.threshold.take(node)
+            missing = np.isnan(x)
+            if missing.any():
+                go_left = np.where(missing, self.default_left.take(node), go_left)
+            node = np.where(go_left, self.left.take(node), self.right.take(node))
+        margin = self.value.take(node).sum(axis=1, dtype=np.float64) + self.base_score
+        return margin.astype(np.float32)
+
+
+def _tree_depth(left: np.ndarray, right: np.ndarray) -> int:
+    depth = np.zeros(len(left), dtype=np.int32)
+    # Nodes are numbered parent-before-child, so one forward pass is enough
+    for i in range(len(left)):
+        if left[i] != -1:
+            depth[left[i]] = depth[right[i]] = depth[i] + 1
+    return int(depth.max()) if len(depth) else 0
+
+
+def compile_model(path: str) -> CompiledForest:
+    return CompiledForest.from_file(path)
@@ -0,0 +1,290 @@
+"""
+Benchmark suite for the scorer and the API.
+
+Measures:
+  - scorer throughput (predict_confidence_batch) at batch sizes 1 .. 100k, cache bypassed
+  - feature extraction speed (vectorized vs scalar)
+  - model load time (compiled JSON / UBJSON, xgboost if installed)
+  - API latency (p50/p95/p99) and requests/second for /api/leads, /api/leads/{id} and /api/score,
+    against the app in-process (default) or a running server (--url http://localhost:8000)
+
+Results are written as JSON and compared against a stored baseline; regressions beyond
+--tolerance are flagged (and fail the run with --fail-on-regression).
+
+Usage (from the repo root):
+  python benchmarks/run_benchmarks.py                 # full run, compare with benchmarks/baseline.json
+  python benchmarks/run_benchmarks.py --quick         # smaller sizes / shorter load phases
+  python benchmarks/run_benchmarks.py --save-baseline # store this run as the new baseline
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import string
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = os.path.join(ROOT, "backend")
+sys.path.insert(0, BACKEND)
+
+# Keep the in-process app away from the real lead store
+os.environ.setdefault("LEAD_STORE_PATH", os.path.join(tempfile.mkdtemp(prefix="hp-bench-"), "leads.db"))
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "latest.json")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+BATCH_SIZES = [1, 10, 100, 1_000, 10_000, 100_000]
+QUICK_BATCH_SIZES = [1, 100, 10_000]
+
+
+def _random_pairs(n: int, seed: int) -> list:
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + " &.-"
+    return [
+        ("".join(rng.choices(alphabet, k=rng.randint(8, 40))), "".join(rng.choices(alphabet, k=rng.randint(10, 60))))
+        for _ in range(n)
+    ]
+
+
+def _timeit(fn, min_seconds: float = 0.5, max_runs: int = 1000) -> float:
+    """Median seconds per call over as many runs as fit in min_seconds (at least 3)."""
+    times = []
+    started = time.perf_counter()
+    while len(times) < 3 or (time.perf_counter() - started < min_seconds and len(times) < max_runs):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def _metric(value, unit: str, better: str) -> dict:
+    return {"value": round(value, 6), "unit": unit, "better": better}
+
+
+# ============ Scorer / features / load ============
+
+def bench_scorer(batch_sizes) -> dict:
+    import ml_model
+
+    results = {}
+    ml_model.predict_confidence_batch(_random_pairs(10, seed=0))  # load + warm
+    ml_model.load_native_backend(wait=True)  # SCORE_BACKEND=auto: measure the steady state, native model loaded
+    for size in batch_sizes:
+        pairs = _random_pairs(size, seed=size)
+
+        def run():
+            ml_model._score_cache.clear()  # measure the model path, not cache hits
+            ml_model.predict_confidence_batch(pairs)
+
+        seconds = _timeit(run, min_seconds=0.5 if size < 10_000 else 0.0)
+        results[f"scorer.batch_{size}.rows_per_s"] = _metric(size / seconds, "rows/s", "higher")
+        results[f"scorer.batch_{size}.latency_ms"] = _metric(seconds * 1000, "ms", "lower")
+
+    pairs = _random_pairs(1_000, seed=1)
+    ml_model.predict_confidence_batch(pairs)
+    seconds = _timeit(lambda: ml_model.predict_confidence_batch(pairs))
+    results["scorer.cached_batch_1000.rows_per_s"] = _metric(1_000 / seconds, "rows/s", "higher")
+    return results
+
+
+def bench_features(n: int) -> dict:
+    from features import text_feature_matrix, text_features
+
+    texts = [f"{c} {s}" for c, s in _random_pairs(n, seed=42)]
+    vec = _timeit(lambda: text_feature_matrix(texts), min_seconds=0.0)
+    scalar = _timeit(lambda: [text_features(t) for t in texts], min_seconds=0.0)
+    return {
+        "features.vectorized.rows_per_s": _metric(n / vec, "rows/s", "higher"),
+        "features.scalar.rows_per_s": _metric(n / scalar, "rows/s", "higher"),
+    }
+
+
+def bench_model_load() -> dict:
+    import ml_model
+    from tree_compiler import compile_model
+
+    results = {}
+    for label, path in (("json", ml_model.MODEL_PATH), ("ubj", ml_model.MODEL_UBJ_PATH)):
+        if os.path.exists(path):
+            seconds = _timeit(lambda: compile_model(path), min_seconds=0.5, max_runs=50)
+            results[f"model_load.compiled_{label}.ms"] = _metric(seconds * 1000, "ms", "lower")
+    try:
+        import xgboost as xgb
+    except Exception:
+        return results
+    for label, path in (("json", ml_model.MODEL_PATH), ("ubj", ml_model.MODEL_UBJ_PATH)):
+        if os.path.exists(path):
+            seconds = _timeit(lambda: xgb.XGBRegressor().load_model(path), min_seconds=0.5, max_runs=50)
+            results[f"model_load.xgboost_{label}.ms"] = _metric(seconds * 1000, "ms", "lower")
+    return results
+
+
+# ============ API load generator ============
+
+async def _load_phase(client, name: str, make_request, concurrency: int, duration: float) -> dict:
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_id: int):
+        nonlocal errors
+        i = 0
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            try:
+                response = await make_request(client, worker_id, i)
+                if response.status_code >= 400:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - t0)
+            i += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000 if latencies else 0.0
+
+    return {
+        f"api.{name}.rps": _metric(len(latencies) / elapsed, "req/s", "higher"),
+        f"api.{name}.p50_ms": _metric(pct(50), "ms", "lower"),
+        f"api.{name}.p95_ms": _metric(pct(95), "ms", "lower"),
+        f"api.{name}.p99_ms": _metric(pct(99), "ms", "lower"),
+        f"api.{name}.errors": _metric(errors, "count", "lower"),
+    }
+
+
+async def _bench_api(url, concurrency: int, duration: float) -> dict:
+    import httpx
+
+    score_pairs = _random_pairs(5_000, seed=7)
+    phases = [
+        ("leads", lambda c, w, i: c.get("/api/leads")),
+        ("lead_dossier", lambda c, w, i: c.get(f"/api/leads/{(i % 6) + 1}")),
+        ("score", lambda c, w, i: c.post("/api/score", json={
+            "company_name": score_pairs[(w * 7919 + i) % len(score_pairs)][0],
+            "signal_text": score_pairs[(w * 7919 + i) % len(score_pairs)][1],
+        })),
+    ]
+
+    results = {}
+    if url:
+        async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+            for name, make in phases:
+                results.update(await _load_phase(client, name, make, concurrency, duration))
+        return results
+
+    import main
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30) as client:
+            for name, make in phases:
+                results.update(await _load_phase(client, name, make, concurrency, duration))
+    return results
+
+
+def bench_api(url, concurrency: int, duration: float) -> dict:
+    try:
+        import httpx  # noqa: F401
+    except ImportError:
+        print("  skipped: httpx not installed (pip install -r benchmarks/requirements.txt)")
+        return {}
+    return asyncio.run(_bench_api(url, concurrency, duration))
+
+
+# ============ Baseline comparison ============
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """Metrics that got worse than baseline by more than tolerance (fraction)."""
+    regressions = []
+    for name, metric in current.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if not base["value"]:
+            # No relative change from zero (e.g. api.*.errors): any move in the wrong direction is a regression
+            moved = metric["value"] - base["value"]
+            if (moved > 0 if metric["better"] == "lower" else moved < 0):
+                regressions.append((name, base["value"], metric["value"], float("inf")))
+            continue
+        change = (metric["value"] - base["value"]) / abs(base["value"])
+        worse = -change if metric["better"] == "higher" else change
+        if worse > tolerance:
+            regressions.append((name, base["value"], metric["value"], worse))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HP-Sentinel scorer and API benchmarks")
+    parser.add_argument("--quick", action="store_true", help="smaller batch sizes and shorter load phases")
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=None, help="seconds per API load phase")
+    parser.add_argument("--skip-api", action="store_true")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write this run to --baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed fractional regression (default 0.2)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    duration = args.duration if args.duration is not None else (2.0 if args.quick else 10.0)
+    results = {}
+    print("Scorer throughput...")
+    results.update(bench_scorer(QUICK_BATCH_SIZES if args.quick else BATCH_SIZES))
+    print("Feature extraction...")
+    results.update(bench_features(20_000 if args.quick else 200_000))
+    print("Model load...")
+    results.update(bench_model_load())
+    if not args.skip_api:
+        print(f"API load ({'in-process' if not args.url else args.url}, concurrency={args.concurrency}, {duration}s/endpoint)...")
+        results.update(bench_api(args.url, args.concurrency, duration))
+
+    for name, metric in results.items():
+        print(f"  {name:45s} {metric['value']:>14,.3f} {metric['unit']}")
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "backend": os.environ.get("SCORE_BACKEND", "auto"),
+        "metrics": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against (run with --save-baseline to create one)")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)["metrics"]
+    regressions = compare(results, baseline, args.tolerance)
+    if not regressions:
+        print(f"No regressions beyond {args.tolerance:.0%} vs baseline")
+        return 0
+    print(f"\nREGRESSIONS (> {args.tolerance:.0%} worse than baseline):")
+    for name, base, now, worse in regressions:
+        print(f"  {name:45s} {base:>12,.3f} -> {now:>12,.3f}  ({worse:+.0%})")
+    return 1 if args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,11 +5,11 @@
 
 const API_BASE = "/api";
 
+// GETs carry no Content-Type so they stay simple requests; the browser HTTP cache then serves
+// dashboard data within Cache-Control max-age and revalidates with If-None-Match (304) after it.
 async function fetchApi(path, options = {}) {
-  const res = await fetch(`${API_BASE}${path}`, {
-    ...options,
-    headers: { "Content-Type": "application/json", ...options.headers },
-  });
+  const headers = options.body ? { "Content-Type": "application/json", ...options.headers } : options.headers;
+  const res = await fetch(`${API_BASE}${path}`, { ...options, headers });
   if (!res.ok) throw new Error(`API error: ${res.status}`);
   return res.json();
 }
@@ -19,7 +19,11 @@ export const api = {
   getLeadsOverTime: () => fetchApi("/leads-over-time"),
   getProductDemand: () => fetchApi("/product-demand"),
   getLeadStatus: () => fetchApi("/lead-status"),
-  getLeads: () => fetchApi("/leads"),
+  // params: { industry, depot, min_confidence, sort, order, cursor, limit }
+  getLeads: (params = {}) => {
+    const query = new URLSearchParams(params).toString();
+    return fetchApi(query ? `/leads?${query}` : "/leads");
+  },
   getLeadDossier: (id) => fetchApi(`/leads/${id}`),
   getFunnel: () => fetchApi("/analytics/funnel"),
   getSectors: () => fetchApi("/analytics/sectors"),
@@ -1,220 +1,606 @@
 """
 XGBoostRegressor model trained on guest_accounts.csv
 Target: password (numeric) | Features: encoded from username and datetime columns
+
+Training runs a k-fold cross-validated hyperparameter search across a process pool. Every fold
+trains with the `hist` tree method and stops early on its validation fold; the best candidate's
+number of rounds is then refit on the whole training split and saved with a JSON search report.
+Plots are a separate, optional step.
+
+--incremental trains out of core: the CSV is read in fixed-size byte blocks and fed through a
+DataIter into xgboost's quantized external-memory matrix, so peak memory depends on the block
+size, not on the size of the history. The byte offset of the last trained row is stored in the
+model, and the next run warm-starts from the saved model using only rows appended since.
+
+Usage:
+  python xgboost_model.py                  # search, train, save model + report, then plot
+  python xgboost_model.py --no-plots       # search, train and save only (nightly retrain)
+  python xgboost_model.py --plots-only     # plots/tables for the saved model, no training
+  python xgboost_model.py --jobs 8 --folds 5 --early-stopping-rounds 30
+  python xgboost_model.py --incremental    # add trees for rows appended since the last run
+  python xgboost_model.py --incremental --restart   # out-of-core training from scratch
 """
 
-import pandas as pd
-import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
-import xgboost as xgb
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
+import argparse
+import io
+import itertools
+import json
 import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+from features import FEATURE_COLS, build_feature_frame
+
+DATA_PATH = "guest_accounts.csv"
+MODEL_PATH = "xgboost_guest_model.json"
+REPORT_PATH = "xgboost_search_report.json"
+PLOTS_DIR = "plots"
+
+RANDOM_STATE = 42
+TEST_SIZE = 0.2
+# Upper bound on boosting rounds; early stopping picks the actual number per candidate
+MAX_ROUNDS = 1000
+EARLY_STOPPING_ROUNDS = 20
+
+# Search space; every combination is one candidate
+PARAM_GRID = {
+    "max_depth": [3, 4, 6, 8],
+    "learning_rate": [0.03, 0.1, 0.3],
+    "min_child_weight": [1, 5],
+    "subsample": [0.8, 1.0],
+}
+# Fixed settings shared by every candidate and the final model
+BASE_PARAMS = {"tree_method": "hist", "random_state": RANDOM_STATE}
+
+# Out-of-core reading: bytes of CSV parsed at a time (bounds peak memory in --incremental mode)
+CHUNK_BYTES = 32 << 20
+# Boosting rounds added per --incremental run on top of an existing model
+INCREMENTAL_ROUNDS = 20
+# Used for a fresh --incremental model when there is no search report to take settings from
+DEFAULT_PARAMS = {"max_depth": 6, "learning_rate": 0.1}
+DEFAULT_ROUNDS = 100
+# Booster attributes recording how much of the CSV the saved model has seen
+TRAINED_BYTES_ATTR = "trained_bytes"
+TRAINED_ROWS_ATTR = "trained_rows"
+
+
+# ============ Data ============
+
+def csv_layout(path: str):
+    """
+    (column names, byte offset of the first data row, byte offset just past the last complete line).
+    A trailing line without a newline may still be being appended, so it is left for the next run.
+    """
+    with open(path, "rb") as f:
+        header = f.readline()
+        data_start = f.tell()
+        end = os.fstat(f.fileno()).st_size
+        while end > data_start:
+            block = min(1 << 16, end - data_start)
+            f.seek(end - block)
+            tail = f.read(block)
+            newline = tail.rfind(b"\n")
+            if newline == block - 1:
+                break
+            if newline >= 0:
+                end = end - block + newline + 1
+                break
+            end -= block
+        end = max(end, data_start)
+    names = list(pd.read_csv(io.BytesIO(header), nrows=0).columns)
+    return names, data_start, end
+
+
+def iter_csv_chunks(path: str, names, start: int, end: int, chunk_bytes: int = CHUNK_BYTES):
+    """DataFrames for the CSV rows in bytes [start, end), parsed about chunk_bytes at a time."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        pos, carry = start, b""
+        while pos < end:
+            data = f.read(min(chunk_bytes, end - pos))
+            if not data:
+                break
+            pos += len(data)
+            data = carry + data
+            carry = b""
+            if pos < end:
+                cut = data.rfind(b"\n") + 1
+                data, carry = data[:cut], data[cut:]
+            if data:
+                # username stays text even when a chunk happens to hold only numeric-looking names
+                yield pd.read_csv(io.BytesIO(data), names=names, header=None, dtype={"username": str})
+
+
+def prepare_chunk(df):
+    """Feature frame X and numeric target y (password) for one block of account rows."""
+    df = df.dropna(subset=["username", "password"])
+
+    # Target: password (convert to numeric)
+    df = df.assign(password=pd.to_numeric(df["password"], errors="coerce"))
+    df = df.dropna(subset=["password"])
+
+    # Feature engineering (shared with the serving code in backend/features.py)
+    df = df.reset_index(drop=True)
+    return build_feature_frame(df, text_col="username"), df["password"]
+
+
+def load_training_data(path: str = DATA_PATH):
+    """
+    Feature frame X, numeric target y and the byte offset just past the last row read.
+    The whole file is held in memory; --incremental streams it instead.
+    """
+    names, data_start, end = csv_layout(path)
+    parts = [prepare_chunk(df) for df in iter_csv_chunks(path, names, data_start, end)]
+    X = pd.concat([p[0] for p in parts], ignore_index=True) if parts else pd.DataFrame(columns=FEATURE_COLS)
+    y = pd.concat([p[1] for p in parts], ignore_index=True) if parts else pd.Series(dtype=float, name="password")
+    X = X[[c for c in FEATURE_COLS if c in X.columns]]
+    return X, y, end
 
-try:
-    import seaborn as sns
-    HAS_SEABORN = True
-except ImportError:
-    HAS_SEABORN = False
-
-# Create output folder for plots
-os.makedirs("plots", exist_ok=True)
-try:
-    plt.style.use("seaborn-v0_8-whitegrid")
-except (OSError, ValueError):
-    try:
-        plt.style.use("seaborn-whitegrid")
-    except (OSError, ValueError):
-        pass
 
-# Load data
-df = pd.read_csv("guest_accounts.csv")
-df = df.dropna(subset=["username", "password"])
+def split_data(X, y):
+    """Fixed train/test split, so --plots-only sees the same test rows the model was evaluated on."""
+    from sklearn.model_selection import train_test_split
 
-# Target: password (convert to numeric)
-df["password"] = pd.to_numeric(df["password"], errors="coerce")
-df = df.dropna(subset=["password"])
+    return train_test_split(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE)
 
-# Feature engineering from username
-def extract_username_features(username):
-    s = str(username)
+
+def regression_metrics(y_true, y_pred) -> dict:
+    from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+
+    return {
+        "rmse": float(np.sqrt(mean_squared_error(y_true, y_pred))),
+        "mae": float(mean_absolute_error(y_true, y_pred)),
+        "r2": float(r2_score(y_true, y_pred)),
+    }
+
+
+# ============ Hyperparameter search ============
+
+def param_candidates(grid: dict = PARAM_GRID) -> list:
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+# (X, y) the search evaluates candidates on; set once per worker process by _init_search_data
+_SEARCH_DATA = None
+
+
+def _init_search_data(x_path: str, y_path: str) -> None:
+    """Pool initializer: memory-map the training arrays once per worker instead of pickling them per task."""
+    global _SEARCH_DATA
+    _SEARCH_DATA = (np.load(x_path, mmap_mode="r"), np.load(y_path, mmap_mode="r"))
+
+
+def _evaluate_candidate(args) -> dict:
+    """
+    k-fold CV for one parameter set on _SEARCH_DATA (runs in a worker process).
+    Each fold trains up to max_rounds and stops early on its validation fold.
+    """
+    import xgboost as xgb
+    from sklearn.model_selection import KFold
+
+    params, folds, max_rounds, early_stopping_rounds, n_jobs = args
+    X, y = _SEARCH_DATA
+    started = time.perf_counter()
+    rmses, rounds = [], []
+    for train_idx, val_idx in KFold(n_splits=folds, shuffle=True, random_state=RANDOM_STATE).split(X):
+        model = xgb.XGBRegressor(
+            n_estimators=max_rounds, early_stopping_rounds=early_stopping_rounds, n_jobs=n_jobs,
+            **BASE_PARAMS, **params,
+        )
+        model.fit(X[train_idx], y[train_idx], eval_set=[(X[val_idx], y[val_idx])], verbose=False)
+        pred = model.predict(X[val_idx], iteration_range=(0, model.best_iteration + 1))
+        rmses.append(float(np.sqrt(np.mean((y[val_idx] - pred) ** 2))))
+        rounds.append(model.best_iteration + 1)
     return {
-        "username_len": len(s),
-        "username_sum_ord": sum(ord(c) for c in s),
-        "num_digits": sum(c.isdigit() for c in s),
-        "num_letters": sum(c.isalpha() for c in s),
+        "params": params,
+        "cv_rmse_mean": float(np.mean(rmses)),
+        "cv_rmse_std": float(np.std(rmses)),
+        "fold_rmse": rmses,
+        "best_rounds": int(round(np.mean(rounds))),
+        "fold_rounds": rounds,
+        "seconds": round(time.perf_counter() - started, 4),
+    }
+
+
+def search(X, y, candidates, folds: int, jobs: int, max_rounds: int, early_stopping_rounds: int) -> list:
+    """
+    Evaluate all candidates across `jobs` processes; results are sorted best (lowest CV RMSE) first.
+    The training arrays are written to .npy files once and memory-mapped by each worker, so tasks carry only params.
+    """
+    global _SEARCH_DATA
+    X, y = np.ascontiguousarray(X, dtype=np.float32), np.ascontiguousarray(y, dtype=np.float64)
+    # Parallelism comes from the pool; each worker's xgboost uses one thread to avoid oversubscription
+    n_jobs = 1 if jobs > 1 else None
+    tasks = [(params, folds, max_rounds, early_stopping_rounds, n_jobs) for params in candidates]
+    if jobs > 1:
+        with tempfile.TemporaryDirectory(prefix="xgb-search-") as tmp:
+            x_path, y_path = os.path.join(tmp, "X.npy"), os.path.join(tmp, "y.npy")
+            np.save(x_path, X)
+            np.save(y_path, y)
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_search_data, initargs=(x_path, y_path)) as pool:
+                results = list(pool.map(_evaluate_candidate, tasks))
+    else:
+        _SEARCH_DATA = (X, y)
+        try:
+            results = [_evaluate_candidate(t) for t in tasks]
+        finally:
+            _SEARCH_DATA = None
+    return sorted(results, key=lambda r: r["cv_rmse_mean"])
+
+
+def train(args) -> None:
+    import xgboost as xgb
+
+    started = time.perf_counter()
+    X, y, trained_bytes = load_training_data(args.data)
+    X_train, X_test, y_train, y_test = split_data(X, y)
+
+    candidates = param_candidates()
+    print(f"Searching {len(candidates)} candidates x {args.folds} folds on {args.jobs} process(es)...")
+    search_started = time.perf_counter()
+    results = search(X_train, y_train, candidates, args.folds, args.jobs, args.max_rounds, args.early_stopping_rounds)
+    search_seconds = time.perf_counter() - search_started
+
+    print("\n--- Top candidates (CV RMSE) ---")
+    for r in results[:5]:
+        print(f"  {r['cv_rmse_mean']:.2f} ± {r['cv_rmse_std']:.2f}  rounds={r['best_rounds']:<4} "
+              f"{r['seconds']:.2f}s  {r['params']}")
+
+    # Refit the best candidate on the whole training split with the CV-chosen number of rounds,
+    # so the saved model holds exactly the trees it predicts with (the compiled serving path uses all trees)
+    best = results[0]
+    fit_started = time.perf_counter()
+    model = xgb.XGBRegressor(n_estimators=best["best_rounds"], **BASE_PARAMS, **best["params"])
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - fit_started
+
+    train_metrics = regression_metrics(y_train, model.predict(X_train))
+    test_metrics = regression_metrics(y_test, model.predict(X_test))
+    print("\nXGBoostRegressor Performance:")
+    print(f"  RMSE:  {test_metrics['rmse']:.2f}")
+    print(f"  MAE:   {test_metrics['mae']:.2f}")
+    print(f"  R²:    {test_metrics['r2']:.4f}")
+
+    # Everything up to trained_bytes is in the model; --incremental continues from there
+    model.get_booster().set_attr(**{TRAINED_BYTES_ATTR: str(trained_bytes), TRAINED_ROWS_ATTR: str(len(X))})
+    save_model(model, args.model)
+
+    report = {
+        "data": os.path.abspath(args.data),
+        "rows": {"train": len(X_train), "test": len(X_test)},
+        "features": list(X.columns),
+        "folds": args.folds,
+        "jobs": args.jobs,
+        "max_rounds": args.max_rounds,
+        "early_stopping_rounds": args.early_stopping_rounds,
+        "base_params": BASE_PARAMS,
+        "best": {**best, "n_estimators": best["best_rounds"]},
+        "metrics": {"train": train_metrics, "test": test_metrics},
+        "timings": {
+            "search_seconds": round(search_seconds, 4),
+            "final_fit_seconds": round(fit_seconds, 4),
+            "total_seconds": round(time.perf_counter() - started, 4),
+        },
+        "candidates": results,
     }
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Search report saved to {args.report}")
+
+    if not args.no_plots:
+        make_plots(model, X, X_train, X_test, y, y_train, y_test)
+
+
+def save_model(model, model_path: str) -> None:
+    """Save model (JSON for inspection, UBJSON for fast loading at serve time)."""
+    ubj_path = os.path.splitext(model_path)[0] + ".ubj"
+    model.save_model(model_path)
+    model.save_model(ubj_path)
+    print(f"\nModel saved to {model_path} and {ubj_path}")
+
+
+# ============ Incremental / out-of-core training ============
+
+def _chunk_iter_class():
+    import xgboost as xgb
+
+    class CsvChunkIter(xgb.DataIter):
+        """Feeds a byte range of the CSV to xgboost one parsed chunk at a time; re-reads the file on reset()."""
+
+        def __init__(self, path, names, start, end, feature_names, chunk_bytes, cache_prefix):
+            self.path, self.names, self.start, self.end = path, names, start, end
+            self.feature_names = list(feature_names)
+            self.chunk_bytes = chunk_bytes
+            self.rows = 0
+            self._chunks = None
+            super().__init__(cache_prefix=cache_prefix)
+
+        def next(self, input_data):
+            if self._chunks is None:
+                self._chunks = iter_csv_chunks(self.path, self.names, self.start, self.end, self.chunk_bytes)
+                self.rows = 0
+            for df in self._chunks:
+                X, y = prepare_chunk(df)
+                if len(X) == 0:
+                    continue
+                # Fixed column set across chunks; datetime columns missing from a chunk become NaN (missing)
+                input_data(data=X.reindex(columns=self.feature_names).astype(np.float32), label=y.to_numpy())
+                self.rows += len(X)
+                return True
+            return False
+
+        def reset(self):
+            self._chunks = None
+
+    return CsvChunkIter
+
+
+def _external_matrix(data_iter):
+    """Quantized training matrix built from the iterator; pages are cached on disk (external memory)."""
+    import xgboost as xgb
+
+    if hasattr(xgb, "ExtMemQuantileDMatrix"):
+        return xgb.ExtMemQuantileDMatrix(data_iter)
+    # xgboost < 3.0: a DMatrix built from an iterator with a cache_prefix is external memory
+    return xgb.DMatrix(data_iter)
+
+
+def _tuned_params(report_path: str):
+    """Best searched parameters and round count from the search report, if there is one."""
+    try:
+        with open(report_path) as f:
+            best = json.load(f)["best"]
+        return best["params"], best["n_estimators"]
+    except (OSError, ValueError, KeyError):
+        return DEFAULT_PARAMS, DEFAULT_ROUNDS
+
+
+def train_incremental(args) -> None:
+    import xgboost as xgb
+
+    started = time.perf_counter()
+    names, start, end = csv_layout(args.data)
+    booster, trained_rows = None, 0
+    if not args.restart and os.path.exists(args.model):
+        booster = xgb.Booster()
+        booster.load_model(args.model)
+        offset = booster.attr(TRAINED_BYTES_ATTR)
+        if offset is None:
+            sys.exit(f"{args.model} does not record which rows it was trained on; rerun with --restart")
+        if int(offset) > end:
+            sys.exit(f"{args.data} is shorter than when {args.model} was trained (rewritten?); rerun with --restart")
+        start, trained_rows = int(offset), int(booster.attr(TRAINED_ROWS_ATTR) or 0)
+    if start >= end:
+        print(f"No new rows in {args.data} since {args.model} was trained")
+        return
+
+    params, fresh_rounds = _tuned_params(args.report)
+    rounds = args.rounds or (INCREMENTAL_ROUNDS if booster is not None else fresh_rounds)
+    feature_names = booster.feature_names if booster is not None and booster.feature_names else FEATURE_COLS
+    train_params = {"tree_method": "hist", "seed": RANDOM_STATE, "objective": "reg:squarederror", **params}
+
+    mode = "Warm-starting from " + args.model if booster is not None else "Training from scratch"
+    print(f"{mode}: {(end - start) / 1e6:.1f} MB of new rows, {rounds} rounds, {train_params}")
+    with tempfile.TemporaryDirectory(prefix="xgb-cache-", dir=args.cache_dir) as cache_dir:
+        data_iter = _chunk_iter_class()(
+            args.data, names, start, end, feature_names, args.chunk_mb << 20, os.path.join(cache_dir, "train"),
+        )
+        dtrain = _external_matrix(data_iter)
+        evals_result = {}
+        booster = xgb.train(
+            train_params, dtrain, num_boost_round=rounds, xgb_model=booster,
+            evals=[(dtrain, "train")], evals_result=evals_result, verbose_eval=False,
+        )
+        new_rows = data_iter.rows
+        del dtrain
+
+    booster.set_attr(**{TRAINED_BYTES_ATTR: str(end), TRAINED_ROWS_ATTR: str(trained_rows + new_rows)})
+    print(f"  New rows:   {new_rows} (total {trained_rows + new_rows})")
+    print(f"  Train RMSE: {evals_result['train']['rmse'][-1]:.2f} on the new rows")
+    print(f"  Trees:      {booster.num_boosted_rounds()}  ({time.perf_counter() - started:.2f}s)")
+    save_model(booster, args.model)
+
+
+# ============ Plots ============
+
+def plot_saved_model(args) -> None:
+    """Rebuild the train/test split and plot the model already on disk."""
+    import xgboost as xgb
+
+    model = xgb.XGBRegressor()
+    model.load_model(args.model)
+    X, y, _ = load_training_data(args.data)
+    X_train, X_test, y_train, y_test = split_data(X, y)
+    make_plots(model, X, X_train, X_test, y, y_train, y_test)
+
+
+def make_plots(model, X, X_train, X_test, y, y_train, y_test) -> None:
+    """Comparison tables and the seven analysis figures under plots/."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    try:
+        import seaborn as sns
+        HAS_SEABORN = True
+    except ImportError:
+        HAS_SEABORN = False
+
+    # Create output folder for plots
+    os.makedirs(PLOTS_DIR, exist_ok=True)
+    try:
+        plt.style.use("seaborn-v0_8-whitegrid")
+    except (OSError, ValueError):
+        try:
+            plt.style.use("seaborn-whitegrid")
+        except (OSError, ValueError):
+            pass
+
+    feature_cols = list(X.columns)
+    y_pred = model.predict(X_test)
+    y_train_pred = model.predict(X_train)
+    train_metrics = regression_metrics(y_train, y_train_pred)
+    test_metrics = regression_metrics(y_test, y_pred)
+
+    # --- Comparison Tables ---
+    # 1. Metrics comparison table (train vs test)
+    metrics_df = pd.DataFrame({
+        "Split": ["Train", "Test"],
+        "RMSE": [train_metrics["rmse"], test_metrics["rmse"]],
+        "MAE": [train_metrics["mae"], test_metrics["mae"]],
+        "R²": [train_metrics["r2"], test_metrics["r2"]],
+    })
+    print("\n--- Metrics Comparison (Train vs Test) ---")
+    print(metrics_df.to_string(index=False))
+    metrics_df.to_csv(f"{PLOTS_DIR}/metrics_comparison.csv", index=False)
+
+    # 2. Actual vs Predicted sample table
+    comparison_df = pd.DataFrame({
+        "Actual": y_test.values,
+        "Predicted": y_pred.round(2),
+        "Residual": (y_test.values - y_pred).round(2),
+        "Abs_Error": np.abs(y_test.values - y_pred).round(2)
+    }).head(15)
+    print("\n--- Actual vs Predicted (sample) ---")
+    print(comparison_df.to_string(index=False))
+    comparison_df.to_csv(f"{PLOTS_DIR}/actual_vs_predicted.csv", index=False)
+
+    # --- Plots ---
+    residuals = y_test.values - y_pred
+
+    # 1. Actual vs Predicted scatter
+    fig, axes = plt.subplots(2, 2, figsize=(12, 10))
+
+    ax = axes[0, 0]
+    ax.scatter(y_test, y_pred, alpha=0.6, edgecolors="k", linewidth=0.5)
+    min_val = min(y_test.min(), y_pred.min())
+    max_val = max(y_test.max(), y_pred.max())
+    ax.plot([min_val, max_val], [min_val, max_val], "r--", lw=2, label="Perfect prediction")
+    ax.set_xlabel("Actual Password")
+    ax.set_ylabel("Predicted Password")
+    ax.set_title("Actual vs Predicted")
+    ax.legend()
+    ax.set_aspect("equal", adjustable="box")
+
+    # 2. Residual plot
+    ax = axes[0, 1]
+    ax.scatter(y_pred, residuals, alpha=0.6, edgecolors="k", linewidth=0.5)
+    ax.axhline(y=0, color="r", linestyle="--", lw=2)
+    ax.set_xlabel("Predicted Password")
+    ax.set_ylabel("Residual")
+    ax.set_title("Residual Plot")
+
+    # 3. Feature importance
+    ax = axes[1, 0]
+    importance = model.feature_importances_
+    feat_imp = pd.Series(importance, index=feature_cols).sort_values(ascending=True)
+    feat_imp.plot(kind="barh", ax=ax, color="steelblue", edgecolor="black")
+    ax.set_xlabel("Importance")
+    ax.set_title("Feature Importance")
+
+    # 4. Target distribution (Train & Test)
+    ax = axes[1, 1]
+    ax.hist(y_train, bins=25, alpha=0.6, label="Train", color="steelblue", edgecolor="black")
+    ax.hist(y_test, bins=25, alpha=0.6, label="Test", color="coral", edgecolor="black")
+    ax.set_xlabel("Password (target)")
+    ax.set_ylabel("Count")
+    ax.set_title("Target Distribution: Train vs Test")
+    ax.legend()
+    plt.tight_layout()
+    plt.savefig(f"{PLOTS_DIR}/model_analysis.png", dpi=150, bbox_inches="tight")
+    plt.close()
+    print(f"\nSaved: {PLOTS_DIR}/model_analysis.png")
+
+    # 5. Correlation heatmap
+    fig, ax = plt.subplots(figsize=(8, 6))
+    corr = X.assign(target=y).corr()
+    if HAS_SEABORN:
+        sns.heatmap(corr, annot=True, fmt=".2f", cmap="coolwarm", center=0, ax=ax, square=True)
+    else:
+        im = ax.imshow(corr, cmap="coolwarm", vmin=-1, vmax=1, aspect="auto")
+        ax.set_xticks(range(len(corr.columns)))
+        ax.set_yticks(range(len(corr.columns)))
+        ax.set_xticklabels(corr.columns, rotation=45, ha="right")
+        ax.set_yticklabels(corr.columns)
+        plt.colorbar(im, ax=ax)
+        for i in range(len(corr)):
+            for j in range(len(corr)):
+                ax.text(j, i, f"{corr.iloc[i, j]:.2f}", ha="center", va="center")
+    ax.set_title("Feature & Target Correlation Heatmap")
+    plt.tight_layout()
+    plt.savefig(f"{PLOTS_DIR}/correlation_heatmap.png", dpi=150, bbox_inches="tight")
+    plt.close()
+    print(f"Saved: {PLOTS_DIR}/correlation_heatmap.png")
+
+    # 6. Residual distribution
+    fig, axes = plt.subplots(1, 2, figsize=(12, 4))
+    axes[0].hist(residuals, bins=25, edgecolor="black", color="steelblue")
+    axes[0].set_xlabel("Residual")
+    axes[0].set_ylabel("Count")
+    axes[0].set_title("Residual Distribution")
+    axes[1].boxplot(residuals, vert=True)
+    axes[1].set_ylabel("Residual")
+    axes[1].set_title("Residual Box Plot")
+    plt.tight_layout()
+    plt.savefig(f"{PLOTS_DIR}/residual_distribution.png", dpi=150, bbox_inches="tight")
+    plt.close()
+    print(f"Saved: {PLOTS_DIR}/residual_distribution.png")
+
+    # 7. Metrics bar comparison
+    fig, ax = plt.subplots(figsize=(8, 4))
+    x = np.arange(len(metrics_df))
+    width = 0.25
+    ax.bar(x - width, metrics_df["RMSE"], width, label="RMSE")
+    ax.bar(x, metrics_df["MAE"], width, label="MAE")
+    ax.bar(x + width, metrics_df["R²"] * 100, width, label="R² (×100)")
+    ax.set_xticks(x)
+    ax.set_xticklabels(metrics_df["Split"])
+    ax.set_ylabel("Value")
+    ax.set_title("Model Metrics: Train vs Test")
+    ax.legend()
+    plt.tight_layout()
+    plt.savefig(f"{PLOTS_DIR}/metrics_comparison.png", dpi=150, bbox_inches="tight")
+    plt.close()
+    print(f"Saved: {PLOTS_DIR}/metrics_comparison.png")
+
+
+# ============ CLI ============
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Train the guest-account XGBoost model")
+    parser.add_argument("--data", default=DATA_PATH, help=f"training CSV (default {DATA_PATH})")
+    parser.add_argument("--model", default=MODEL_PATH, help=f"output model; a .ubj copy is saved next to it (default {MODEL_PATH})")
+    parser.add_argument("--report", default=REPORT_PATH, help=f"search report JSON (default {REPORT_PATH})")
+    parser.add_argument("--folds", type=int, default=5, help="cross-validation folds (default 5)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="search worker processes (default: CPU count)")
+    parser.add_argument("--max-rounds", type=int, default=MAX_ROUNDS, help=f"boosting round cap (default {MAX_ROUNDS})")
+    parser.add_argument("--early-stopping-rounds", type=int, default=EARLY_STOPPING_ROUNDS,
+                        help=f"stop a fold after this many rounds without validation improvement (default {EARLY_STOPPING_ROUNDS})")
+    parser.add_argument("--restart", action="store_true", help="with --incremental: ignore the saved model and train from the first row")
+    parser.add_argument("--rounds", type=int, default=None,
+                        help=f"with --incremental: boosting rounds to add (default {INCREMENTAL_ROUNDS}, or the searched count for a fresh model)")
+    parser.add_argument("--chunk-mb", type=int, default=CHUNK_BYTES >> 20, help=f"with --incremental: MB of CSV parsed at a time (default {CHUNK_BYTES >> 20})")
+    parser.add_argument("--cache-dir", default=None, help="with --incremental: directory for the external-memory page cache (default: system temp)")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--no-plots", action="store_true", help="skip plots and comparison tables")
+    group.add_argument("--plots-only", action="store_true", help="only plot the saved --model; no training")
+    group.add_argument("--incremental", action="store_true", help="out-of-core training on rows appended since the saved model; no search or plots")
+    args = parser.parse_args(argv)
+
+    if args.plots_only:
+        plot_saved_model(args)
+    elif args.incremental:
+        train_incremental(args)
+    else:
+        train(args)
+
 
-features = df["username"].apply(lambda x: pd.Series(extract_username_features(x)))
-df = pd.concat([df.reset_index(drop=True), features], axis=1)
-
-# Datetime features
-for col in ["valid_from", "valid_to"]:
-    if col in df.columns and df[col].notna().any():
-        df[col] = pd.to_datetime(df[col], errors="coerce")
-        df[f"{col}_hour"] = df[col].dt.hour
-        df[f"{col}_day"] = df[col].dt.day
-        df[f"{col}_month"] = df[col].dt.month
-
-feature_cols = ["username_len", "username_sum_ord", "num_digits", "num_letters"]
-for c in ["valid_from_hour", "valid_from_day", "valid_from_month", "valid_to_hour", "valid_to_day", "valid_to_month"]:
-    if c in df.columns:
-        feature_cols.append(c)
-
-X = df[feature_cols]
-y = df["password"]
-
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-# Train XGBoostRegressor
-model = xgb.XGBRegressor(n_estimators=100, max_depth=6, learning_rate=0.1, random_state=42)
-model.fit(X_train, y_train)
-
-# Evaluate
-y_pred = model.predict(X_test)
-y_train_pred = model.predict(X_train)
-
-rmse = np.sqrt(mean_squared_error(y_test, y_pred))
-mae = mean_absolute_error(y_test, y_pred)
-r2 = r2_score(y_test, y_pred)
-
-print("XGBoostRegressor Performance:")
-print(f"  RMSE:  {rmse:.2f}")
-print(f"  MAE:   {mae:.2f}")
-print(f"  R²:    {r2:.4f}")
-
-# --- Comparison Tables ---
-# 1. Metrics comparison table (train vs test)
-metrics_df = pd.DataFrame({
-    "Split": ["Train", "Test"],
-    "RMSE": [
-        np.sqrt(mean_squared_error(y_train, y_train_pred)),
-        rmse
-    ],
-    "MAE": [
-        mean_absolute_error(y_train, y_train_pred),
-        mae
-    ],
-    "R²": [
-        r2_score(y_train, y_train_pred),
-        r2
-    ]
-})
-print("\n--- Metrics Comparison (Train vs Test) ---")
-print(metrics_df.to_string(index=False))
-metrics_df.to_csv("plots/metrics_comparison.csv", index=False)
-
-# 2. Actual vs Predicted sample table
-comparison_df = pd.DataFrame({
-    "Actual": y_test.values,
-    "Predicted": y_pred.round(2),
-    "Residual": (y_test.values - y_pred).round(2),
-    "Abs_Error": np.abs(y_test.values - y_pred).round(2)
-}).head(15)
-print("\n--- Actual vs Predicted (sample) ---")
-print(comparison_df.to_string(index=False))
-comparison_df.to_csv("plots/actual_vs_predicted.csv", index=False)
-
-# --- Plots ---
-residuals = y_test.values - y_pred
-
-# 1. Actual vs Predicted scatter
-fig, axes = plt.subplots(2, 2, figsize=(12, 10))
-
-ax = axes[0, 0]
-ax.scatter(y_test, y_pred, alpha=0.6, edgecolors="k", linewidth=0.5)
-min_val = min(y_test.min(), y_pred.min())
-max_val = max(y_test.max(), y_pred.max())
-ax.plot([min_val, max_val], [min_val, max_val], "r--", lw=2, label="Perfect prediction")
-ax.set_xlabel("Actual Password")
-ax.set_ylabel("Predicted Password")
-ax.set_title("Actual vs Predicted")
-ax.legend()
-ax.set_aspect("equal", adjustable="box")
-
-# 2. Residual plot
-ax = axes[0, 1]
-ax.scatter(y_pred, residuals, alpha=0.6, edgecolors="k", linewidth=0.5)
-ax.axhline(y=0, color="r", linestyle="--", lw=2)
-ax.set_xlabel("Predicted Password")
-ax.set_ylabel("Residual")
-ax.set_title("Residual Plot")
-
-# 3. Feature importance
-ax = axes[1, 0]
-importance = model.feature_importances_
-feat_imp = pd.Series(importance, index=feature_cols).sort_values(ascending=True)
-feat_imp.plot(kind="barh", ax=ax, color="steelblue", edgecolor="black")
-ax.set_xlabel("Importance")
-ax.set_title("Feature Importance")
-
-# 4. Target distribution (Train & Test)
-ax = axes[1, 1]
-ax.hist(y_train, bins=25, alpha=0.6, label="Train", color="steelblue", edgecolor="black")
-ax.hist(y_test, bins=25, alpha=0.6, label="Test", color="coral", edgecolor="black")
-ax.set_xlabel("Password (target)")
-ax.set_ylabel("Count")
-ax.set_title("Target Distribution: Train vs Test")
-ax.legend()
-plt.tight_layout()
-plt.savefig("plots/model_analysis.png", dpi=150, bbox_inches="tight")
-plt.close()
-print("\nSaved: plots/model_analysis.png")
-
-# 5. Correlation heatmap
-fig, ax = plt.subplots(figsize=(8, 6))
-corr = X.assign(target=y).corr()
-if HAS_SEABORN:
-    sns.heatmap(corr, annot=True, fmt=".2f", cmap="coolwarm", center=0, ax=ax, square=True)
-else:
-    im = ax.imshow(corr, cmap="coolwarm", vmin=-1, vmax=1, aspect="auto")
-    ax.set_xticks(range(len(corr.columns)))
-    ax.set_yticks(range(len(corr.columns)))
-    ax.set_xticklabels(corr.columns, rotation=45, ha="right")
-    ax.set_yticklabels(corr.columns)
-    plt.colorbar(im, ax=ax)
-    for i in range(len(corr)):
-        for j in range(len(corr)):
-            ax.text(j, i, f"{corr.iloc[i, j]:.2f}", ha="center", va="center")
-ax.set_title("Feature & Target Correlation Heatmap")
-plt.tight_layout()
-plt.savefig("plots/correlation_heatmap.png", dpi=150, bbox_inches="tight")
-plt.close()
-print("Saved: plots/correlation_heatmap.png")
-
-# 6. Residual distribution
-fig, axes = plt.subplots(1, 2, figsize=(12, 4))
-axes[0].hist(residuals, bins=25, edgecolor="black", color="steelblue")
-axes[0].set_xlabel("Residual")
-axes[0].set_ylabel("Count")
-axes[0].set_title("Residual Distribution")
-axes[1].boxplot(residuals, vert=True)
-axes[1].set_ylabel("Residual")
-axes[1].set_title("Residual Box Plot")
-plt.tight_layout()
-plt.savefig("plots/residual_distribution.png", dpi=150, bbox_inches="tight")
-plt.close()
-print("Saved: plots/residual_distribution.png")
-
-# 7. Metrics bar comparison
-fig, ax = plt.subplots(figsize=(8, 4))
-x = np.arange(len(metrics_df))
-width = 0.25
-ax.bar(x - width, metrics_df["RMSE"], width, label="RMSE")
-ax.bar(x, metrics_df["MAE"], width, label="MAE")
-ax.bar(x + width, metrics_df["R²"] * 100, width, label="R² (×100)")
-ax.set_xticks(x)
-ax.set_xticklabels(metrics_df["Split"])
-ax.set_ylabel("Value")
-ax.set_title("Model Metrics: Train vs Test")
-ax.legend()
-plt.tight_layout()
-plt.savefig("plots/metrics_comparison.png", dpi=150, bbox_inches="tight")
-plt.close()
-print("Saved: plots/metrics_comparison.png")
-
-# Save model
-model.save_model("xgboost_guest_model.json")
-print("\nModel saved to xgboost_guest_model.json")
+if __name__ == "__main__":
+    main()